@@ -0,0 +1,80 @@
+"""Times adding songs to the playlist view and the play queue, one at a time and in one batch.
+
+Each run starts from an empty, shown view and includes the layout and paint that follow.
+Thumbnails are left out, so the numbers are the views' own.
+
+python benchmarks/bulk_insert.py --songs 1000 5000 10000
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtWidgets import QApplication, QWidget
+
+from ytm_qt import CacheHandler, CacheItem, Icons
+from ytm_qt.operation_dataclasses import SongRequest
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlists import PlaylistView
+
+
+def timed(app: QApplication, widget: QWidget, fill: Callable[[], None]) -> float:
+    widget.resize(400, 800)
+    widget.show()
+    app.processEvents()
+    start = time.perf_counter()
+    fill()
+    app.processEvents()
+    widget.repaint()
+    elapsed = time.perf_counter() - start
+    widget.close()
+    widget.deleteLater()
+    return elapsed * 1000
+
+
+def playlist(cache: CacheHandler, songs: list[CacheItem]) -> PlaylistView:
+    view = PlaylistView()
+    view.set_cache_handler(cache)
+    view.thumbnails.failed.update(song.thumbnail for song in songs)
+    return view
+
+
+def queue(cache: CacheHandler, songs: list[CacheItem]) -> OperationWrapper:
+    view = OperationWrapper(Icons.get(), cache)
+    view.thumbnails.failed.update(song.thumbnail for song in songs)
+    return view
+
+
+def compare(app: QApplication, cache: CacheHandler, n: int):
+    songs = list(fake_songs(cache, n))
+    requests = [SongRequest(song) for song in songs]
+
+    view = playlist(cache, songs)
+    one = timed(app, view, lambda: [view.add_item(song) for song in songs])
+    batched = playlist(cache, songs)
+    batch = timed(app, batched, lambda: batched.add_items(songs))
+    print(f"Playlist, {n} songs: {one:.0f} ms one at a time, {batch:.0f} ms batched")
+
+    wrapper = queue(cache, songs)
+    one = timed(app, wrapper, lambda: [wrapper.add_song(request) for request in requests])
+    batched_wrapper = queue(cache, songs)
+    batch = timed(app, batched_wrapper, lambda: batched_wrapper.add_songs(requests))
+    print(f"Queue, {n} songs: {one:.0f} ms one at a time, {batch:.0f} ms batched")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 5000, 10000])
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    for n in args.songs:
+        compare(app, cache, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Animates downloads in the play queue and measures what painting them costs.
+
+The visible songs are all set downloading, and their progress moves ten times a second like
+yt-dlp reports it. After a while they finish, so the checkmarks are revealed and faded out too.
+Every song has its thumbnail on disk already, as it would after the first run.
+
+python benchmarks/download_animation.py --downloads 20 --seconds 5
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtCore import QEvent, QEventLoop, QObject, Qt, QTimer
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.caching.thumbnails import PYRAMID, variant_path
+from ytm_qt.eye_candy.animation_clock import AnimationClock
+from ytm_qt.eye_candy.download_progress_frame import DownloadStatus
+from ytm_qt.operation_dataclasses import SongRequest
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+
+
+class PaintCounter(QObject):
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.paints = 0
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+def run(app: QApplication, seconds: float) -> tuple[float, float]:
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    wall, cpu = time.perf_counter(), time.process_time()
+    loop.exec()
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.downloads))
+    image = QImage(PYRAMID[0], PYRAMID[0], QImage.Format.Format_RGB32)
+    image.fill(Qt.GlobalColor.darkCyan)
+    for song in songs:
+        song.thumbnail.parent.mkdir(parents=True, exist_ok=True)
+        image.save(str(variant_path(song.thumbnail, PYRAMID[0])), "PNG")
+
+    queue = OperationWrapper(Icons.get(), cache)
+    for song in songs:
+        queue.add_song(SongRequest(song))
+    queue.resize(400, 80 * args.downloads)
+    queue.show()
+    counter = PaintCounter(queue)
+    queue.view.viewport().installEventFilter(counter)
+    run(app, 0.5)
+
+    wall, cpu = run(app, args.seconds)
+    print(f"Idle: {cpu / wall:.1%} CPU, {counter.paints} paints")
+
+    playing = list(queue.model.root.songs())
+    for song in playing:
+        song.set_status(DownloadStatus.DOWNLOADING)
+    reports = 0
+
+    def report():
+        nonlocal reports
+        reports += 1
+        for song in playing:
+            song.progress = min(reports / 100, 1.0)
+
+    reporter = QTimer()
+    reporter.setInterval(100)
+    reporter.timeout.connect(report)
+    reporter.start()
+    clock = AnimationClock.get()
+    counter.paints, ticks = 0, clock.ticks
+    wall, cpu = run(app, args.seconds)
+    reporter.stop()
+    print(
+        f"{len(playing)} downloading: {cpu / wall:.1%} CPU,"
+        f" {counter.paints / wall:.0f} paints/s, {(clock.ticks - ticks) / wall:.0f} ticks/s"
+    )
+
+    for song in playing:
+        song.set_status(DownloadStatus.FINISHED)
+    counter.paints = 0
+    wall, cpu = run(app, 2)
+    print(f"Finishing: {cpu / wall:.1%} CPU, {counter.paints} paints, clock running: {clock.active()}")
+
+
+if __name__ == "__main__":
+    main()
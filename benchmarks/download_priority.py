@@ -0,0 +1,89 @@
+"""Queues prefetches behind a slow download, promotes the last one, and checks it goes next.
+
+The pipeline's extract stage gets one worker and a local server, which holds its first answer
+back so the rest pile up in the queue. The last prefetch queued is then promoted to now playing,
+the way a song that starts playing is. The server sees the order the stage works in, and the
+promoted request has to reach it right after the slow one; the script fails otherwise.
+
+python benchmarks/download_priority.py --queued 20
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+from PySide6.QtCore import QCoreApplication, QUrl
+
+from ytm_qt.settings import opts
+from ytm_qt.threads.bandwidth import TrafficClass
+from ytm_qt.threads.download_pipeline import DownloadPipeline
+from ytm_qt.threads.ytdlrunner import YTMDownload
+
+
+class Recorder(BaseHTTPRequestHandler):
+    paths: ClassVar[list[str]] = []
+    first = threading.Event()
+
+    def do_GET(self):
+        Recorder.paths.append(self.path)
+        if len(Recorder.paths) == 1:
+            Recorder.first.set()
+            time.sleep(0.5)
+        # Nothing yt-dlp can extract, so every request fails straight away once answered
+        self.send_response(404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queued", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Recorder)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    pipeline = DownloadPipeline({**opts, "quiet": True, "noprogress": True}, workers={"extract": 1})
+    requests = [
+        YTMDownload(QUrl(f"http://127.0.0.1:{port}/{n}"), traffic_class=TrafficClass.PREFETCH)
+        for n in range(args.queued + 1)
+    ]
+    pending = len(requests)
+
+    def finished():
+        nonlocal pending
+        pending -= 1
+        if not pending:
+            app.quit()
+
+    for request in requests:
+        request.finished.connect(finished)
+
+    pipeline.start()
+    pipeline.submit(requests[0])
+    assert Recorder.first.wait(10), "the first request never reached the server"
+    for request in requests[1:]:
+        pipeline.submit(request)
+    promoted = requests[-1]
+    start = time.perf_counter()
+    promoted.promote(TrafficClass.NOW_PLAYING)
+    promoted.started.connect(lambda: print(f"Promoted request started {time.perf_counter() - start:.3f} s later"))
+    app.exec()
+
+    pipeline.stop()
+    pipeline.wait()
+    server.shutdown()
+
+    position = Recorder.paths.index(promoted.url.path())
+    print(f"Promoted request was queued behind {args.queued - 1} others, and reached the server after {position}")
+    assert position == 1, "the promoted request waited behind prefetches queued before it"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Downloads from a local server that only answers 503, and checks the failures are retried.
+
+A song goes through the download pipeline and an info extraction through a `YoutubeDLProvider`,
+each against its own host. Both have to be retried until they run out of attempts, with every
+try counted against their host's breaker, before they fail; the script fails otherwise.
+
+python benchmarks/download_retry.py
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+
+from PySide6.QtCore import QCoreApplication, QUrl
+
+from ytm_qt.settings import opts
+from ytm_qt.telemetry import Telemetry
+from ytm_qt.threads.download_pipeline import DownloadPipeline
+from ytm_qt.threads.retry import CircuitBreakers, FailureHandler, RetryPolicy
+from ytm_qt.threads.ytdlrunner import YoutubeDLProvider, YTDLUser, YTMDownload, YTMExtractInfo
+
+
+class Unavailable(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        Unavailable.hits += 1
+        self.send_response(503)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for both to fail")
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    policy = RetryPolicy()
+    breakers = CircuitBreakers(threshold=policy.attempts + 1)
+    telemetry = Telemetry()
+    ytdl_opts = {**opts, "quiet": True, "noprogress": True}
+    pipeline = DownloadPipeline(ytdl_opts, breakers=breakers, telemetry=telemetry)
+    queue: Queue[YTDLUser | None] = Queue()
+    provider = YoutubeDLProvider(
+        ytdl_opts, queue, FailureHandler(breakers, policy), telemetry.pool("ytdl", queue.qsize)
+    )
+
+    errors: list[Exception] = []
+    pending = 2
+
+    def finished():
+        nonlocal pending
+        pending -= 1
+        if not pending:
+            app.quit()
+
+    download = YTMDownload(QUrl(f"http://127.0.0.1:{port}/song"))
+    extraction = YTMExtractInfo(f"http://localhost:{port}/playlist")
+    for request in (download, extraction):
+        request.error.connect(errors.append)
+        request.finished.connect(finished)
+
+    start = time.perf_counter()
+    pipeline.start()
+    provider.start()
+    pipeline.submit(download)
+    queue.put(extraction)
+    timer = threading.Timer(args.timeout, app.quit)
+    timer.start()
+    app.exec()
+    timer.cancel()
+    elapsed = time.perf_counter() - start
+
+    pipeline.stop()
+    provider.stop()
+    pipeline.wait()
+    provider.wait()
+    server.shutdown()
+
+    pools = telemetry.snapshot()["pools"]
+    extract, ytdl = pools["download/extract"], pools["ytdl"]
+    print(
+        f"{Unavailable.hits} requests in {elapsed:.1f} s: pipeline retried {extract['retried']},"
+        f" provider retried {ytdl['retried']}, {len(errors)} failed"
+    )
+    assert not pending, "a request never finished"
+    assert len(errors) == 2
+    assert extract["retried"] == ytdl["retried"] == policy.attempts - 1, "503s weren't retried"
+    for host in ("127.0.0.1", "localhost"):
+        assert breakers.breakers[host].failures == policy.attempts, f"{host}'s breaker was reset by a 503"
+
+
+if __name__ == "__main__":
+    main()
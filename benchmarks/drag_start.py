@@ -0,0 +1,78 @@
+"""Times starting a drag out of the playlist, and dropping it on the play queue, for growing selections.
+
+Starting a drag builds its MIME data and its picture, the way the playlist's view does, which is
+what happens between pressing the mouse and the drag following the cursor. The drop is timed on the queue's model, without the
+view laying itself out afterwards. The same drop is then done with the keys encoded, the way
+another process would deliver them.
+
+python benchmarks/drag_start.py --songs 10000 --selected 1 100 1000 10000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtCore import QItemSelection, QItemSelectionModel, QMimeData, Qt
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlists import PlaylistView
+from ytm_qt.song_widget.song_drag import SONG_KEYS_MIME, drag_pixmap, selected_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=10_000)
+    parser.add_argument("--selected", type=int, nargs="+", default=[1, 100, 1000, 10_000])
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.songs))
+    playlist = PlaylistView()
+    playlist.set_cache_handler(cache)
+    playlist.thumbnails.failed.update(song.thumbnail for song in songs)
+    playlist.add_items(songs)
+    playlist.resize(400, 800)
+    playlist.show()
+    app.processEvents()
+    view, model = playlist.view, playlist.model
+
+    for n in args.selected:
+        queue = OperationWrapper(Icons.get(), cache)
+        queue.thumbnails.failed.update(song.thumbnail for song in songs)
+        selection = view.selectionModel()
+        selection.select(
+            QItemSelection(model.index(0), model.index(n - 1)), QItemSelectionModel.SelectionFlag.ClearAndSelect
+        )
+        selection.setCurrentIndex(model.index(0), QItemSelectionModel.SelectionFlag.NoUpdate)
+
+        start = time.perf_counter()
+        rows = [row for _, top, bottom in selected_rows(view) for row in range(top, bottom + 1)]
+        data = model.rows_mime(rows)
+        drag_pixmap(view, view.currentIndex(), len(rows))
+        started = time.perf_counter() - start
+
+        start = time.perf_counter()
+        queue.model.dropMimeData(data, Qt.DropAction.CopyAction, -1, 0, queue.model.index_of(queue.model.root))
+        dropped = time.perf_counter() - start
+
+        encoded = QMimeData()
+        encoded.setData(SONG_KEYS_MIME, data.data(SONG_KEYS_MIME))
+        start = time.perf_counter()
+        queue.model.dropMimeData(encoded, Qt.DropAction.CopyAction, -1, 0, queue.model.index_of(queue.model.root))
+        decoded = time.perf_counter() - start
+
+        assert len(queue) == 2 * n
+        print(
+            f"{n} selected: drag starts in {started * 1000:.2f} ms,"
+            f" drops in {dropped * 1000:.2f} ms, {decoded * 1000:.2f} ms from another process"
+        )
+        queue.deleteLater()
+
+
+if __name__ == "__main__":
+    main()
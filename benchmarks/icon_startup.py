@@ -0,0 +1,99 @@
+"""Measures the time from process start to the first paint of a window showing a few icons.
+
+Every run is a fresh process, so nothing is shared between them except the disk cache.
+The window shows the icons the player controls and play queue need at launch.
+
+python benchmarks/icon_startup.py --runs 10
+"""
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STARTUP_ICONS = (
+    "play_button",
+    "prev",
+    "next",
+    "more_horiz",
+    "play_button",
+    "repeat_one",
+    "pan_zoom",
+    "repeat_bold",
+    "shuffle",
+    "shuffle_bold",
+)
+
+
+def child(mode: str, cache_dir: str):
+    start = time.perf_counter()
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication, QHBoxLayout, QToolButton, QWidget
+
+    from ytm_qt.icons import Icons
+
+    app = QApplication([])
+    icons = Icons.get("white", Path(cache_dir) if mode == "cached" else None)
+    if mode == "eager":
+        # What building every icon up front costs
+        for name in vars(Icons):
+            if not name.startswith("_") and name not in ("get", "render"):
+                getattr(icons, name)
+
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    for name in STARTUP_ICONS:
+        button = QToolButton()
+        button.setIcon(getattr(icons, name))
+        layout.addWidget(button)
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint:
+                print(f"{(time.perf_counter() - start) * 1000:.2f}")
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    painted = FirstPaint()
+    window.installEventFilter(painted)
+    window.show()
+    app.exec()
+
+
+def run(mode: str, cache_dir: Path) -> float:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--cache", str(cache_dir)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--child", choices=("eager", "lazy", "cached"))
+    parser.add_argument("--cache", type=str)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.cache)
+        return
+
+    cache_dir = Path(tempfile.mkdtemp())
+    try:
+        run("cached", cache_dir)  # fills the disk cache
+        print(f"{'mode':<8} {'median':>10} {'min':>10}")
+        for mode in ("eager", "lazy", "cached"):
+            times = [run(mode, cache_dir) for _ in range(args.runs)]
+            print(f"{mode:<8} {statistics.median(times):>8.1f}ms {min(times):>8.1f}ms")
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Fills the playlist view with fake songs and times scrolling through it.
+
+Each step moves the scroll bar by a fraction of a page and repaints the viewport synchronously,
+which is the work one frame costs. Thumbnails are left out, so the numbers are the view's own.
+
+python benchmarks/playlist_scroll.py --rows 50000 --frames 600
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler
+from ytm_qt.dicts import SongMetaData
+from ytm_qt.playlists import PlaylistView
+
+
+def fake_songs(cache: CacheHandler, n: int):
+    for i in range(n):
+        yield cache(
+            f"song{i}",
+            SongMetaData(
+                title=f"Song number {i} with a fairly long title to elide",
+                description=None,
+                duration=180 + i % 120,
+                artist=f"Artist {i % 300}",
+                url=f"https://music.youtube.com/watch?v=song{i}",
+                thumbnail={"url": f"http://127.0.0.1:1/{i}.jpg", "width": 60, "height": 60, "preference": None},
+                audio_format=None,
+            ),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.rows))
+
+    view = PlaylistView()
+    view.set_cache_handler(cache)
+    # Nothing is downloaded here, keep the loader from asking for it
+    view.thumbnails.failed.update(song.thumbnail for song in songs)
+    view.resize(400, 800)
+    view.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    for song in songs:
+        view.add_item(song)
+    app.processEvents()
+    print(f"Added {args.rows} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    bar = view.view.verticalScrollBar()
+    viewport = view.view.viewport()
+    step = max(bar.maximum() // args.frames, bar.pageStep() // 4)
+    frames = []
+    for i in range(args.frames):
+        start = time.perf_counter()
+        bar.setValue((i * step) % (bar.maximum() + 1))
+        viewport.repaint()
+        frames.append((time.perf_counter() - start) * 1000)
+    frames.sort()
+    print(
+        f"Frame: median {statistics.median(frames):.2f} ms,"
+        f" 99th {frames[int(len(frames) * 0.99)]:.2f} ms, worst {frames[-1]:.2f} ms"
+        f" ({1000 / statistics.median(frames):.0f} fps)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Drags songs over the play queue and times every move of the cursor.
+
+The cursor sweeps down the visible rows of one large group a few pixels at a time, the way a
+slow drag would, and each move is followed by the repaint it causes. The painted area says how
+much of the view a move repaints. Thumbnails are left out, so the numbers are the view's own.
+
+python benchmarks/queue_drag.py --songs 10000 --step 3
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtCore import QEvent, QObject, QPointF, Qt
+from PySide6.QtGui import QDragEnterEvent, QDragLeaveEvent, QDragMoveEvent, QPaintEvent
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.operation_dataclasses import OperationRequest, SongRequest
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlist_generators.song_ops import PlayOnce
+
+
+class PaintArea(QObject):
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.area = 0
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if isinstance(event, QPaintEvent):
+            for rect in event.region():
+                self.area += rect.width() * rect.height()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=10_000)
+    parser.add_argument("--step", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.songs))
+    queue = OperationWrapper(Icons.get(), cache)
+    queue.thumbnails.failed.update(song.thumbnail for song in songs)
+    queue.add_song(OperationRequest(PlayOnce, {}, [SongRequest(song) for song in songs]))
+    queue.resize(400, 800)
+    queue.show()
+    app.processEvents()
+
+    view = queue.view
+    viewport = view.viewport()
+    model = queue.model
+    group = model.index(0, 0)
+    data = model.mimeData([model.index(row, 0, group) for row in range(0, args.songs, 7)])
+    counter = PaintArea(viewport)
+    viewport.installEventFilter(counter)
+
+    buttons, modifiers = Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier
+    actions = Qt.DropAction.MoveAction | Qt.DropAction.CopyAction
+    start = QPointF(viewport.width() / 2, 0)
+    QApplication.sendEvent(viewport, QDragEnterEvent(start, actions, data, buttons, modifiers))
+    app.processEvents()
+
+    times = []
+    # Stays clear of the bottom edge, where the view would start scrolling
+    for y in range(0, viewport.height() - view.autoScrollMargin() * 2, args.step):
+        begin = time.perf_counter()
+        QApplication.sendEvent(viewport, QDragMoveEvent(QPointF(start.x(), y), actions, data, buttons, modifiers))
+        app.processEvents()
+        times.append((time.perf_counter() - begin) * 1000)
+    QApplication.sendEvent(viewport, QDragLeaveEvent())
+    app.processEvents()
+
+    times.sort()
+    full = viewport.width() * viewport.height()
+    print(
+        f"{len(times)} moves over {args.songs} songs: median {statistics.median(times):.3f} ms,"
+        f" 99th {times[int(len(times) * 0.99)]:.3f} ms,"
+        f" {counter.area / len(times) / full:.1%} of the view painted per move"
+    )
+
+
+if __name__ == "__main__":
+    main()
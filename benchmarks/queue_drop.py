@@ -0,0 +1,92 @@
+"""Times dropping songs and groups around the play queue, for queues of growing size.
+
+The queue is nested: groups of songs inside groups, `--depth` levels deep. Each drop picks a few
+random nodes, checks the drop like Qt does while dragging, then drops them into a random group.
+Only the model is timed, without a view relaying itself out afterwards, and the tree is checked
+for consistency once the drops are done.
+
+python benchmarks/queue_drop.py --songs 1000 10000 100000 --depth 6
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtCore import QCoreApplication, Qt
+
+from ytm_qt import CacheHandler
+from ytm_qt.operation_dataclasses import OperationRequest, SongRequest
+from ytm_qt.playlist_generators.queue_model import OperationNode, QueueModel, QueueNode, ancestors
+from ytm_qt.playlist_generators.song_ops import PlayOnce
+
+
+def nested(songs: list[SongRequest], depth: int, width: int = 8) -> OperationRequest:
+    """Groups of `width` parts, `depth` levels deep, with the songs spread between the innermost groups."""
+    if depth == 0 or len(songs) <= width:
+        return OperationRequest(PlayOnce, {}, list(songs))
+    step = -(-len(songs) // width)
+    return OperationRequest(
+        PlayOnce, {}, [nested(songs[i : i + step], depth - 1, width) for i in range(0, len(songs), step)]
+    )
+
+
+def every_node(group: OperationNode) -> list[QueueNode]:
+    nodes: list[QueueNode] = []
+    stack = [group]
+    while stack:
+        for child in stack.pop().children:
+            nodes.append(child)
+            if isinstance(child, OperationNode):
+                stack.append(child)
+    return nodes
+
+
+def run(cache: CacheHandler, n: int, depth: int, drops: int) -> list[float]:
+    model = QueueModel(cache)
+    model.insert(model.root, None, [model.create_node(nested([SongRequest(s) for s in fake_songs(cache, n)], depth))])
+    nodes = every_node(model.root)
+    groups = [model.root, *(node for node in nodes if isinstance(node, OperationNode))]
+    rng = random.Random(0)
+
+    times = []
+    while len(times) < drops:
+        dragged = rng.sample(nodes, rng.randint(1, 5))
+        target = rng.choice(groups)
+        parent = model.index_of(target)
+        row = rng.randrange(-1, len(target.children) + 1)
+        start = time.perf_counter()
+        data = model.mimeData([model.index_of(node) for node in dragged])
+        if not model.canDropMimeData(data, Qt.DropAction.MoveAction, row, 0, parent):
+            # Into itself; still a drop that was asked about and refused
+            times.append((time.perf_counter() - start) * 1000)
+            continue
+        model.dropMimeData(data, Qt.DropAction.MoveAction, row, 0, parent)
+        times.append((time.perf_counter() - start) * 1000)
+        assert not any(node in ancestors(target) for node in dragged if isinstance(node, OperationNode))
+    model.check()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--drops", type=int, default=2000)
+    args = parser.parse_args()
+
+    QCoreApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    for n in args.songs:
+        times = sorted(run(cache, n, args.depth, args.drops))
+        print(
+            f"{n} songs: median {statistics.median(times):.3f} ms,"
+            f" 99th {times[int(len(times) * 0.99)]:.3f} ms, worst {times[-1]:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Moves songs around inside one large group of the play queue and times each move.
+
+A move is what a drop inside the group does: the model looks up the song's row and moves it, and
+the view catches up. The model's part is timed on its own too, without a view, and has to stay
+about as fast however large the group is. The view's part grows with the group, since a
+QTreeView lays every expanded row out again after a move. Status changes are timed too, since
+each one looks its song's row up again.
+
+python benchmarks/queue_reorder.py --songs 1000 10000 30000 --moves 500
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.eye_candy.download_progress_frame import DownloadStatus
+from ytm_qt.operation_dataclasses import OperationRequest, SongRequest
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlist_generators.queue_model import OperationNode, QueueModel, SongNode
+from ytm_qt.playlist_generators.song_ops import PlayOnce
+
+
+def report(name: str, times: list[float]):
+    times.sort()
+    print(
+        f"{name}: median {statistics.median(times):.3f} ms,"
+        f" 99th {times[int(len(times) * 0.99)]:.3f} ms, worst {times[-1]:.3f} ms"
+    )
+
+
+def model_moves(cache: CacheHandler, songs: list, moves: int) -> list[float]:
+    model = QueueModel(cache)
+    model.insert(model.root, None, [model.create_node(OperationRequest(PlayOnce, {}, [SongRequest(s) for s in songs]))])
+    group = model.root.children[0]
+    assert isinstance(group, OperationNode)
+    rng = random.Random(0)
+
+    times = []
+    for _ in range(moves):
+        node = group.children[rng.randrange(len(group.children))]
+        row = rng.randrange(len(group.children) + 1)
+        start = time.perf_counter()
+        model.move([node], group, row)
+        times.append((time.perf_counter() - start) * 1000)
+    model.check()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 10_000, 30_000])
+    parser.add_argument("--moves", type=int, default=500)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    for n in args.songs:
+        songs = list(fake_songs(cache, n))
+        report(f"{n} songs, model only", model_moves(cache, songs, args.moves))
+
+        queue = OperationWrapper(Icons.get(), cache)
+        queue.thumbnails.failed.update(song.thumbnail for song in songs)
+        queue.add_song(OperationRequest(PlayOnce, {}, [SongRequest(song) for song in songs]))
+        queue.resize(400, 800)
+        queue.show()
+        app.processEvents()
+
+        model = queue.model
+        group = model.root.children[0]
+        assert isinstance(group, OperationNode)
+        rng = random.Random(0)
+
+        moves = []
+        for _ in range(args.moves):
+            node = group.children[rng.randrange(len(group.children))]
+            row = rng.randrange(len(group.children) + 1)
+            start = time.perf_counter()
+            model.move([node], group, row)
+            app.processEvents()
+            moves.append((time.perf_counter() - start) * 1000)
+        report(f"{n} songs, with the view", moves)
+
+        changes = []
+        for _ in range(args.moves):
+            node = group.children[rng.randrange(len(group.children))]
+            assert isinstance(node, SongNode)
+            start = time.perf_counter()
+            node.song.set_status(DownloadStatus.FINISHED)
+            changes.append((time.perf_counter() - start) * 1000)
+        report(f"{n} songs, status change", changes)
+        queue.close()
+        queue.deleteLater()
+
+
+if __name__ == "__main__":
+    main()
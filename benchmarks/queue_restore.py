@@ -0,0 +1,63 @@
+"""Restores a large saved play queue and times how long until it's painted.
+
+The queue is built the way `queue.json` stores it: songs at the top level with every tenth
+of them inside a looped group. Thumbnails are left out, so the numbers are the queue's own.
+
+python benchmarks/queue_restore.py --songs 5000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtWidgets import QApplication, QWidget
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlist_generators.song_ops import OperationSerializer, RecursiveOperationDict
+from ytm_qt.song_widget.queue_song import QueueSong
+
+
+def saved_queue(keys: list[str]) -> RecursiveOperationDict:
+    songs: list = []
+    for start in range(0, len(keys), 10):
+        songs.extend(keys[start : start + 9])
+        songs.append({"key": "LoopNTimes", "settings": {"times": 2}, "songs": keys[start + 9 : start + 10]})
+    return {"key": "PlayOnce", "settings": {}, "songs": songs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.songs))
+    dct = saved_queue([song.key for song in songs])
+    opser: OperationSerializer[QueueSong] = OperationSerializer.default()
+
+    queue = OperationWrapper(Icons.get(), cache)
+    # Nothing is downloaded here, keep the loader from asking for it
+    queue.thumbnails.failed.update(song.thumbnail for song in songs)
+    queue.resize(400, 800)
+    queue.show()
+    app.processEvents()
+    widgets = len(queue.findChildren(QWidget))
+
+    start = time.perf_counter()
+    queue.populate(opser.from_dict(dct, lambda s: QueueSong(cache[s])))
+    app.processEvents()
+    queue.view.viewport().repaint()
+    print(f"Restored {args.songs} songs in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"Widgets: {widgets} empty, {len(queue.findChildren(QWidget))} full")
+
+    start = time.perf_counter()
+    queue.generate_operations()
+    print(f"Generated operations in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Loads a playlist and the play queue with the same songs and clears them again, over and over.
+
+Some of the queued songs ask for their audio too, like prefetching does. Memory is read after
+every clear. It has to stop growing once the first few rounds have warmed the caches up, and no
+`QueueSong` may outlive the queue it was in, even before the cycle collector runs; the script
+fails otherwise.
+
+python benchmarks/reload_leak.py --songs 5000 --rounds 20
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from playlist_scroll import fake_songs
+from PySide6.QtCore import QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication
+
+from ytm_qt import CacheHandler, Icons
+from ytm_qt.operation_dataclasses import OperationRequest, SongRequest
+from ytm_qt.playlist_generators.op_wrapper import OperationWrapper
+from ytm_qt.playlist_generators.song_ops import PlayOnce
+from ytm_qt.playlists import PlaylistView
+from ytm_qt.song_widget.queue_song import QueueSong
+
+
+def rss() -> int:
+    """Resident memory of this process, in bytes."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def settle(app: QApplication):
+    """Runs the deferred deletes."""
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    app.processEvents()
+
+
+def alive() -> int:
+    """How many `QueueSong`s exist, including ones only the cycle collector would free."""
+    return sum(isinstance(o, QueueSong) for o in gc.get_objects())
+
+
+def prefetch(queue: OperationWrapper, every: int):
+    for song in islice(queue.model.root.songs(), 0, None, every):
+        song.request_song_()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=4, help="MiB memory may still move after warming up")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    cache = CacheHandler(Path(tempfile.mkdtemp()))
+    songs = list(fake_songs(cache, args.songs))
+    playlist = PlaylistView()
+    playlist.set_cache_handler(cache)
+    queue = OperationWrapper(Icons.get(), cache)
+    for widget in (playlist, queue):
+        widget.resize(400, 800)
+        widget.show()
+
+    after = []
+    for n in range(args.rounds):
+        # Clearing forgets failed thumbnails, so they have to be marked again every round
+        for widget in (playlist, queue):
+            widget.thumbnails.failed.update(song.thumbnail for song in songs)
+        start = time.perf_counter()
+        playlist.add_items(songs)
+        queue.add_songs(
+            [SongRequest(song) for song in songs[: args.songs // 2]]
+            + [OperationRequest(PlayOnce, {}, [SongRequest(song) for song in songs[args.songs // 2 :]])]
+        )
+        app.processEvents()
+        loaded = time.perf_counter() - start
+        prefetch(queue, 50)
+        playlist.clear()
+        queue.clear()
+        settle(app)
+        left = alive()
+        gc.collect()
+        after.append(rss())
+        print(f"Round {n + 1}: loaded in {loaded * 1000:.0f} ms, {after[-1] / 2**20:.1f} MiB, {left} QueueSongs left")
+        assert left == 0, "QueueSongs outlived the queue"
+
+    growth = (max(after[args.warmup :]) - after[args.warmup]) / 2**20
+    print(f"Growth after round {args.warmup}: {growth:.1f} MiB")
+    assert growth <= args.tolerance, f"memory kept growing by {growth:.1f} MiB"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compares thumbnail codecs by bytes on disk, encode time and decode time.
+
+Encoding uses Pillow, like the icon workers. Decoding uses QImage, like the views.
+Pass --images with a folder of real album art for representative numbers, otherwise
+photo-like images are generated.
+
+python benchmarks/thumbnail_codec.py --images ~/Pictures/covers --size 128
+"""
+
+import argparse
+import io
+import random
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+from PySide6.QtGui import QImage
+
+from ytm_qt.caching.thumbnails import ThumbnailCodec, square_thumbnail
+
+CODECS = (
+    ThumbnailCodec("PNG"),
+    ThumbnailCodec("JPEG", 90),
+    ThumbnailCodec("WEBP", 85),
+    ThumbnailCodec("WEBP", 75),
+)
+
+
+def fake_cover(seed: int, size: int = 544) -> bytes:
+    """Gradients, shapes and grain, which compress roughly like album art."""
+    rng = random.Random(seed)
+    im = Image.linear_gradient("L").resize((size, size)).convert("RGB")
+    tints = [rng.random() for _ in range(3)]
+    im = Image.merge("RGB", [band.point(lambda v, k=k: int(v * k)) for band, k in zip(im.split(), tints)])
+    draw = ImageDraw.Draw(im)
+    for _ in range(12):
+        x, y, r = rng.randrange(size), rng.randrange(size), rng.randrange(10, size // 3)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    im = im.filter(ImageFilter.GaussianBlur(3))
+    grain = Image.effect_noise((size, size), 24).convert("RGB")
+    im = Image.blend(im, grain, 0.15)
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=None)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size", type=int, default=128)
+    args = parser.parse_args()
+
+    if args.images is not None:
+        sources = [p.read_bytes() for p in sorted(args.images.iterdir()) if p.is_file()][: args.count]
+    else:
+        sources = [fake_cover(i) for i in range(args.count)]
+    thumbnails = [square_thumbnail(content, args.size) for content in sources]
+    print(f"{len(thumbnails)} thumbnails at {args.size}px")
+    print(f"{'codec':<12}{'bytes':>8}{'encode':>10}{'decode':>10}")
+    for codec in CODECS:
+        codec.encode(thumbnails[0])  # warm up the encoder
+        start = time.perf_counter()
+        encoded = [codec.encode(im) for im in thumbnails]
+        encode = (time.perf_counter() - start) / len(encoded)
+
+        start = time.perf_counter()
+        for data in encoded:
+            assert not QImage.fromData(data).isNull()
+        decode = (time.perf_counter() - start) / len(encoded)
+
+        name = codec.format if codec.format == "PNG" else f"{codec.format} {codec.quality}"
+        size = sum(map(len, encoded)) / len(encoded)
+        print(f"{name:<12}{size:>8.0f}{encode * 1000:>8.2f}ms{decode * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
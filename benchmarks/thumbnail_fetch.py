@@ -0,0 +1,95 @@
+"""Compares thumbnails/sec of a bare `requests.get` per icon against the pooled `HttpClient`.
+
+Serves a fake thumbnail over HTTPS from a local keep-alive server, so the numbers include the
+TCP and TLS handshakes a CDN would cost. Needs `openssl` on the PATH for the certificate.
+
+    python benchmarks/thumbnail_fetch.py --count 1000 --workers 6
+"""
+
+import argparse
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from ytm_qt.threads.http_client import HttpClient
+
+BODY = bytes(range(256)) * 64  # ~16KiB, about the size of a 544x544 jpg thumbnail
+
+
+class ThumbnailHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(tmp: Path) -> tuple[ThreadingHTTPServer, Path]:
+    cert, key = tmp / "cert.pem", tmp / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThumbnailHandler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cert
+
+
+def bench(name: str, fetch, urls: list[str], workers: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        total = sum(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10}{len(urls) / elapsed:>10.1f} thumbnails/s  ({elapsed:.2f}s, {total / 1024 / 1024:.1f} MiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server, cert = serve(Path(tmp))
+        urls = [f"https://127.0.0.1:{server.server_port}/vi/{i}/sddefault.jpg" for i in range(args.count)]
+
+        def old(url: str) -> int:
+            data = requests.get(url, stream=True, verify=cert)
+            data.raise_for_status()
+            return len(data.content)
+
+        client = HttpClient(max_connections=args.workers)
+
+        def new(url: str) -> int:
+            with client.get(url, verify=cert) as data:
+                data.raise_for_status()
+                return len(data.content)
+
+        bench("old", old, urls, args.workers)
+        bench("pooled", new, urls, args.workers)
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measures thumbnails/sec on one core for the old disk round-trip processing and the in-memory pass.
+
+python benchmarks/thumbnail_process.py --count 200 --width 1280 --height 720
+"""
+
+import argparse
+import io
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+from ytm_qt.caching.thumbnails import THUMBNAIL_SIZE, save_thumbnail, square_thumbnail
+
+
+def fake_thumbnail(width: int, height: int) -> bytes:
+    """A blurred noise jpg, which compresses about as badly as a photo."""
+    rng = random.Random(0)
+    im = Image.frombytes("RGB", (width // 8, height // 8), rng.randbytes(width // 8 * height // 8 * 3))
+    im = im.resize((width, height), Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def old(content: bytes, path: Path):
+    with open(path, "wb") as f:
+        f.write(content)
+    im = Image.open(path)
+    width, height = im.size
+    smaller = min(width, height)
+    left = (width - smaller) / 2
+    top = (height - smaller) / 2
+    im = im.crop((left, top, (width + smaller) / 2, (height + smaller) / 2))  # type: ignore
+    if smaller > THUMBNAIL_SIZE:
+        im = im.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.ADAPTIVE)  # type: ignore
+    im.save(path, "PNG")
+
+
+def new(content: bytes, path: Path):
+    save_thumbnail(square_thumbnail(content), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    content = fake_thumbnail(args.width, args.height)
+    print(f"{args.width}x{args.height} jpg, {len(content) / 1024:.0f} KiB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, process in (("old", old), ("in-memory", new)):
+            start = time.perf_counter()
+            for i in range(args.count):
+                process(content, Path(tmp, f"{name}{i}"))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:<10}{args.count / elapsed:>8.1f} thumbnails/s/core  ({elapsed / args.count * 1000:.2f}ms each)"
+            )
+
+
+if __name__ == "__main__":
+    main()
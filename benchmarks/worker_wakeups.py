@@ -0,0 +1,136 @@
+"""Counts how often idle download workers wake up, and times how long a submitted job waits for one.
+
+Both the `YoutubeDLProvider`s and the download pipeline's stage workers are measured. Wakeups are
+the voluntary context switches of the process's threads while nothing is queued, read from /proc,
+so the workers don't have to count them themselves. Latency is the time from submitting a job
+to a worker starting it, with the workers idle beforehand. A provider builds its `YoutubeDL`
+before it starts a job, so that time is printed too; the rest is the wait for a worker.
+
+python benchmarks/worker_wakeups.py --idle 5 --jobs 20
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from queue import Queue
+
+from PySide6.QtCore import QCoreApplication, Qt, QUrl
+from yt_dlp import YoutubeDL
+
+from ytm_qt.settings import opts
+from ytm_qt.threads.download_pipeline import DownloadPipeline
+from ytm_qt.threads.ytdlrunner import YoutubeDLProvider, YTDLUser, YTMDownload
+
+
+class Probe(YTDLUser):
+    def process(self, ytdl: YoutubeDL):
+        pass
+
+
+def context_switches() -> int:
+    """Voluntary context switches of every thread but this one."""
+    total = 0
+    for tid in os.listdir("/proc/self/task"):
+        if int(tid) == threading.get_native_id():
+            continue
+        try:
+            with open(f"/proc/self/task/{tid}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("voluntary_ctxt_switches"))
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def idle_wakeups(seconds: float) -> float:
+    """Wakeups per second of the other threads while this one sleeps."""
+    before = context_switches()
+    time.sleep(seconds)
+    return (context_switches() - before) / seconds
+
+
+def start_delay(user: YTDLUser, submit: Callable[[], None]) -> float:
+    """Milliseconds from `submit` to a worker starting `user`. Returns once it finished."""
+    started: list[float] = []
+    finished = threading.Event()
+    user.started.connect(lambda: started.append(time.perf_counter()), Qt.ConnectionType.DirectConnection)
+    user.finished.connect(finished.set, Qt.ConnectionType.DirectConnection)
+    begin = time.perf_counter()
+    submit()
+    assert finished.wait(10), "a job never finished"
+    return (started[0] - begin) * 1000
+
+
+def latencies(jobs: int, submit: Callable[[], tuple[YTDLUser, Callable[[], None]]]) -> list[float]:
+    times = []
+    for _ in range(jobs):
+        # Lets the workers go back to sleep first
+        time.sleep(0.1)
+        times.append(start_delay(*submit()))
+    return times
+
+
+def ytdl_build(opts: dict) -> float:
+    """Milliseconds to build and close a `YoutubeDL`, once its imports are warm."""
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        with YoutubeDL(opts):
+            pass
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times[1:])
+
+
+def report(name: str, wakeups: float, times: list[float]):
+    times.sort()
+    print(
+        f"{name}: {wakeups:.1f} wakeups/s idle, job starts after median {statistics.median(times):.2f} ms,"
+        f" worst {times[-1]:.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=5, help="Seconds to count idle wakeups for")
+    parser.add_argument("--jobs", type=int, default=20)
+    args = parser.parse_args()
+
+    QCoreApplication([])
+    ytdl_opts = {**opts, "quiet": True, "noprogress": True}
+    print(f"Building a YoutubeDL takes {ytdl_build(ytdl_opts):.2f} ms")
+
+    queue: Queue[YTDLUser | None] = Queue()
+    providers = [YoutubeDLProvider(ytdl_opts, queue) for _ in range(3)]
+    for provider in providers:
+        provider.start()
+    time.sleep(0.5)
+
+    def submit_probe():
+        probe = Probe()
+        return probe, lambda: queue.put(probe)
+
+    report("3 providers", idle_wakeups(args.idle), latencies(args.jobs, submit_probe))
+    for provider in providers:
+        provider.stop()
+    for provider in providers:
+        provider.wait()
+
+    pipeline = DownloadPipeline(ytdl_opts)
+    pipeline.start()
+    time.sleep(0.5)
+    workers = sum(len(stage.workers) for stage in pipeline.stages)
+
+    def submit_download():
+        # Not a URL yt-dlp can resolve, so it fails as soon as the extract stage starts it
+        request = YTMDownload(QUrl("about:blank"))
+        return request, lambda: pipeline.submit(request)
+
+    report(f"Pipeline, {workers} workers", idle_wakeups(args.idle), latencies(args.jobs, submit_download))
+    pipeline.stop()
+    pipeline.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import contextlib
 import sys
-from collections import deque
 from pathlib import Path
 from pprint import pprint
 from queue import Queue
@@ -10,12 +9,12 @@ import orjson
 import polars as pl
 from polars import DataFrame, LazyFrame
 from PySide6.QtCore import (
+    QDeadlineTimer,
     QEvent,
     QMimeData,
     QPoint,
     QPointF,
     Qt,
-    QThreadPool,
     QUrl,
     Signal,
     Slot,
@@ -52,7 +51,7 @@ from PySide6.QtWidgets import (
 )
 
 from .audio_player import PlayerDock
-from .caching import CacheHandler
+from .caching import CacheHandler, PixmapCache
 from .dicts import (
     YTMDownloadResponse,
     YTMPlaylistResponse,
@@ -69,8 +68,13 @@ from .operation_dataclasses import OperationRequest, SongRequest
 from .playlist_generators.op_wrapper import OperationWrapper
 from .playlist_generators.song_ops import OperationSerializer, RecursiveOperationDict
 from .playlists import PlaylistDock, PlaylistView
-from .song_widget.song_widget import SongWidget
-from .threads.download_icons import DownloadIconProvider
+from .settings import bandwidth_limits, opts, thumbnail_codec
+from .song_widget.queue_song import QueueSong
+from .telemetry import Telemetry, TelemetryDock
+from .threads.bandwidth import BandwidthScheduler
+from .threads.download_icons import IconDownloader
+from .threads.download_pipeline import DownloadPipeline
+from .threads.retry import CircuitBreakers, FailureHandler
 from .threads.ytdlrunner import YoutubeDLProvider, YTDLUser, YTMDownload, YTMExtractInfo
 
 URL = r"https://music.youtube.com/playlist?list=PLu_TDFCG1ZjxzrBAAULOOQrr-6sgf4da8"
@@ -80,28 +84,6 @@ URL = r"https://music.youtube.com/playlist?list=PLu_TDFCG1ZjxzrBAAULOOQrr-6sgf4d
 # search:   https://music.youtube.com/search?q=hurry+hurry
 
 
-opts = {
-    "check_formats": "selected",
-    "extract_flat": "discard_in_playlist",
-    "format": "bestaudio/best",
-    "fragment_retries": 10,
-    "ignoreerrors": "only_download",
-    "outtmpl": {"default": "cache/%(id)s"},
-    "postprocessors": [
-        {
-            "key": "FFmpegExtractAudio",
-            "preferredquality": "5",
-        },
-        {
-            "key": "FFmpegConcat",
-            "only_multi_video": True,
-            "when": "playlist",
-        },
-    ],
-    "retries": 10,
-}
-
-
 class MainWindow(QMainWindow):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -110,43 +92,71 @@ class MainWindow(QMainWindow):
 
         col = ("black", "white")[bool(dd.isDark())]
 
-        self.icons = Icons.get(col)
+        self.cache_dir = Path("cache")
+        self.icons = Icons.get(col, self.cache_dir / "icons")
         self.fonts = Fonts.get()
 
         self.header = Header(self)
         self.header.searched.connect(self.extract_url)
         self.setMenuWidget(self.header)
 
-        self.opser: OperationSerializer[SongWidget] = OperationSerializer.default()
+        self.opser: OperationSerializer[QueueSong] = OperationSerializer.default()
 
-        self.cache_dir = Path("cache")
         self.db_path = self.cache_dir / "db.feather"
         self.cache = CacheHandler(self.cache_dir)
         self.cache.load()
         self.queue_saved_path = self.cache_dir / "queue.json"
 
-        self.ytdlp_queue: deque[YTDLUser] = deque()
-        self.ytdlp_providers = [YoutubeDLProvider(opts, self.ytdlp_queue) for _ in range(3)]
+        # Paused hosts are shared by everything that downloads
+        self.breakers = CircuitBreakers()
+        self.bandwidth = BandwidthScheduler(**bandwidth_limits)
+        self.telemetry = Telemetry()
+        self.telemetry.add_source("bandwidth", self.bandwidth.throughput)
+        self.telemetry.add_source("paused_hosts", self.breakers.open_hosts)
+        self.telemetry.add_source("pixmaps", PixmapCache.get().stats)
+
+        self.ytdlp_queue: Queue[YTDLUser | None] = Queue()
+        self.ytdlp_failures: FailureHandler[YTDLUser] = FailureHandler(self.breakers)
+        ytdlp_stats = self.telemetry.pool("ytdl", self.ytdlp_queue.qsize)
+        self.ytdlp_providers = [
+            YoutubeDLProvider(opts, self.ytdlp_queue, self.ytdlp_failures, ytdlp_stats) for _ in range(3)
+        ]
         for provider in self.ytdlp_providers:
             provider.start()
 
-        self.icon_download_queue = Queue()
-        self.icon_threadpool = QThreadPool(self)
-        self.icon_providers = [DownloadIconProvider(self.icon_download_queue) for _ in range(6)]
-        for provider in self.icon_providers:
-            self.icon_threadpool.start(provider)
+        self.download_pipeline = DownloadPipeline(
+            opts,
+            scheduler=self.bandwidth,
+            breakers=self.breakers,
+            telemetry=self.telemetry,
+        )
+        self.download_pipeline.start()
+
+        self.icon_downloader = IconDownloader(
+            scheduler=self.bandwidth,
+            breakers=self.breakers,
+            telemetry=self.telemetry,
+            codec=thumbnail_codec,
+            parent=self,
+        )
 
         infotask = YTMExtractInfo(URL)
         infotask.processed.connect(self.info_extracted)
-        self.ytdlp_queue.append(infotask)
+        self.ytdlp_queue.put(infotask)
 
         self.player_dock = PlayerDock(self.icons, self.fonts, parent=self)
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.player_dock)
 
-        self.play_queue_op = OperationWrapper(self.icons, self.cache, parent=self)
+        self.telemetry_dock = TelemetryDock(self.telemetry, self.cache_dir / "telemetry", parent=self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.telemetry_dock)
+        self.splitDockWidget(self.player_dock, self.telemetry_dock, Qt.Orientation.Horizontal)
+        self.telemetry_dock.hide()
+
+        self.play_queue_op = OperationWrapper(self.icons, self.cache, self.fonts, parent=self)
         self.play_queue_op.manager_generated.connect(self.player_dock.player.set_manager)
         self.player_dock.player.request_manager.connect(self.play_queue_op.validate_operations)
         self.play_queue_op.request_song.connect(self.song_requested)
+        self.play_queue_op.request_new_icon.connect(self.icon_downloader.request)
         self.play_queue_dock = QDockWidget()
         self.play_queue_dock.setWidget(self.play_queue_op)
         self.play_queue_dock.setMinimumWidth(400)
@@ -164,19 +174,13 @@ class MainWindow(QMainWindow):
                 try:
                     ops = self.opser.from_dict(
                         orjson.loads(f.read()),
-                        lambda s: SongWidget(
-                            self.cache[s],
-                            playable=True,
-                            icons=self.icons,
-                            fonts=self.fonts,
-                            parent=self.play_queue_op,
-                        ),
+                        lambda s: QueueSong(self.cache[s]),
                     )
                     self.play_queue_op.populate(ops)
                 except Exception as e:
                     print(e)
 
-        self.playlist_view = PlaylistView(self)
+        self.playlist_view = PlaylistView(self.icons, self.fonts, parent=self)
         self.playlist_view.set_cache_handler(self.cache)
         self.playlist_dock = PlaylistDock(
             cache_handler=self.cache,
@@ -186,9 +190,10 @@ class MainWindow(QMainWindow):
             parent=self,
         )
         self.playlist_view.add_to_queue.connect(self.playlist_sampled)
+        self.playlist_view.add_all_to_queue.connect(self.play_queue_op.add_songs)
         self.playlist_view.add_group.connect(self.playlist_sampled)
         self.playlist_dock.setMinimumWidth(300)
-        self.playlist_dock.request_new_icon.connect(self.icon_download_queue.put)
+        self.playlist_dock.request_new_icon.connect(self.icon_downloader.request)
         self.playlist_dock.setAllowedAreas(
             Qt.DockWidgetArea.NoDockWidgetArea
             | Qt.DockWidgetArea.LeftDockWidgetArea
@@ -205,17 +210,21 @@ class MainWindow(QMainWindow):
         self.save_action.triggered.connect(self.save_queue)
         self.addAction(self.save_action)
 
+        self.telemetry_action = self.telemetry_dock.toggleViewAction()
+        self.telemetry_action.setShortcut(QKeySequence(Qt.Modifier.CTRL | Qt.Modifier.SHIFT | Qt.Key.Key_D))
+        self.addAction(self.telemetry_action)
+
     @Slot(str)
     def extract_url(self, url: str):
         request = YTMExtractInfo(url, parent=self)
         request.processed.connect(self.info_extracted)
-        self.ytdlp_queue.append(request)
+        self.ytdlp_queue.put(request)
 
     @Slot(YTMDownload)
     def song_requested(self, request: YTMDownload):
-        self.ytdlp_queue.append(request)
+        self.download_pipeline.submit(request)
 
-    @Slot(SongWidget)
+    @Slot(object)
     def playlist_sampled(self, song: SongRequest | OperationRequest):
         self.play_queue_op.add_song(song)
 
@@ -230,8 +239,7 @@ class MainWindow(QMainWindow):
             case ResponseTypes.PLAYLIST:
                 playlist: YTMPlaylistResponse = info  # type: ignore
                 self.playlist_dock.clear()
-                for entry in playlist["entries"]:
-                    self.playlist_dock.add_song(entry)
+                self.playlist_dock.add_songs(playlist["entries"])
 
             case ResponseTypes.SEARCH:
                 _search: YTMSearchResponse = info  # type: ignore
@@ -259,13 +267,19 @@ class MainWindow(QMainWindow):
             self.cache.save()
             df.write_ipc(self.db_path)
 
+            # Every thread gets the same 10 seconds, and whatever is still busy after that is killed
+            deadline = QDeadlineTimer(10_000)
             for provider in self.ytdlp_providers:
                 provider.stop()
-                provider.wait(10_000)
-                provider.terminate()
+            self.download_pipeline.stop()
+            for provider in self.ytdlp_providers:
+                if not provider.wait(deadline):
+                    provider.terminate()
+                    provider.wait()
+            if not self.download_pipeline.wait(deadline):
+                self.download_pipeline.terminate()
 
-            for provider in self.icon_providers:
-                provider.stop()
+            self.icon_downloader.shutdown()
 
         return super().closeEvent(event)
 
@@ -33,6 +33,7 @@ from PySide6.QtWidgets import (
 from ytm_qt import Fonts, Icons
 from ytm_qt.audio_player.control_buttons import ControlButtons
 from ytm_qt.playlist_generators.track_manager import TrackManager
+from ytm_qt.threads.bandwidth import TrafficClass
 
 from .audio_player import AudioPlayer
 
@@ -160,7 +161,7 @@ class Player(QWidget):
                 self.play(self.manager.current_song.filepath)
             else:
                 self.manager.current_song.song_gathered.connect(self.play)
-                self.manager.current_song.ensure_audio_exists()
+                self.manager.current_song.ensure_audio_exists(TrafficClass.NOW_PLAYING)
 
     def move_next(self):
         assert self.manager is not None
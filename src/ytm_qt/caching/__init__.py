@@ -1 +1,2 @@
 from .cache_handlers import AudioCache, CacheHandler, CacheItem
+from .pixmap_cache import PixmapCache, PixmapKey
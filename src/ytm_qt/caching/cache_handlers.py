@@ -1,19 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 import orjson
 
 from ytm_qt.dicts import SongMetaData, YTMSmallVideoResponse
 
+from .thumbnails import ThumbnailValidators, pick_source
+
 
 class AudioCache(TypedDict):
     thumbnail: Path
     audio: Path
     metadata: SongMetaData | None
+    thumbnail_http: NotRequired[dict[str, ThumbnailValidators]]  # by source url
 
 
 @dataclass
@@ -31,6 +35,8 @@ class CacheItem:
             dct["thumbnail"] = str(me["thumbnail"])
         if "metadata" in me:
             dct["metadata"] = me["metadata"]
+        if "thumbnail_http" in me:
+            dct["thumbnail_http"] = me["thumbnail_http"]
         dct["key"] = self.key
 
         return dct
@@ -44,6 +50,8 @@ class CacheItem:
             dct["thumbnail"] = Path(d["thumbnail"])
         if "metadata" in d:
             dct["metadata"] = d["metadata"]
+        if "thumbnail_http" in d:
+            dct["thumbnail_http"] = d["thumbnail_http"]
 
         return cls(
             parent,
@@ -54,9 +62,20 @@ class CacheItem:
     @property
     def thumbnail(self):
         if "thumbnail" not in self.d:
-            self.d["thumbnail"] = self.parent.new_object("thumbnail")
+            metadata = self.d.get("metadata")
+            self.d["thumbnail"] = (
+                self.parent.thumbnail_object(metadata["thumbnail"]["url"])
+                if metadata is not None
+                else self.parent.new_object("thumbnail")
+            )
         return self.parent.pth / self.d["thumbnail"]
 
+    def thumbnail_validators(self, url: str) -> ThumbnailValidators | None:
+        return self.d.get("thumbnail_http", {}).get(url)
+
+    def set_thumbnail_validators(self, validators: ThumbnailValidators):
+        self.d.setdefault("thumbnail_http", {})[validators["url"]] = validators
+
     @property
     def audio(self):
         if "audio" not in self.d:
@@ -76,19 +95,12 @@ class CacheItem:
         if dct["id"] in parent:
             return parent[dct["id"]]
 
-        thumbnail = max(
-            dct["thumbnails"],
-            key=lambda d: (
-                d.get("height"),
-                d.get("width"),
-                d.get("preference"),
-            ),
-        )
+        thumbnail = pick_source(dct["thumbnails"], None)
         item = cls(
             parent,
             dct["id"],
             {
-                "thumbnail": parent.new_object("thumbnail"),
+                "thumbnail": parent.thumbnail_object(thumbnail["url"]),
                 "audio": parent.new_object("audio"),
                 "metadata": SongMetaData(
                     {
@@ -98,6 +110,7 @@ class CacheItem:
                         "artist": dct["channel"],
                         "url": dct["url"],
                         "thumbnail": thumbnail,
+                        "thumbnails": dct["thumbnails"],
                         "audio_format": None,
                     }
                 ),
@@ -135,7 +148,7 @@ class CacheHandler:
             self.pth.mkdir(parents=True)
 
         self.__config_pth = self.pth / "index.json"
-        self.items = [p.relative_to(self.pth) for p in self.pth.glob("*")]
+        self.items = {p.relative_to(self.pth) for p in self.pth.glob("*")}
         self.categories = []
 
     def __setitem__(self, k: str, v: CacheItem):
@@ -146,7 +159,13 @@ class CacheHandler:
             self.__dct[key] = CacheItem(
                 self,
                 key,
-                {"thumbnail": self.new_object("thumbnail"), "audio": self.new_object("audio"), "metadata": metadata},
+                {
+                    "thumbnail": self.thumbnail_object(metadata["thumbnail"]["url"])
+                    if metadata is not None
+                    else self.new_object("thumbnail"),
+                    "audio": self.new_object("audio"),
+                    "metadata": metadata,
+                },
             )
         return self.__dct[key]
 
@@ -159,9 +178,13 @@ class CacheHandler:
     def new_object(self, category="_uncategorized"):
         while (id_ := category / Path(str(uuid.uuid4()))) in self.items:
             pass
-        self.items.append(id_)
+        self.items.add(id_)
         return id_
 
+    def thumbnail_object(self, url: str) -> Path:
+        """Thumbnails are named after their url, so items sharing artwork share the files too."""
+        return Path("thumbnail") / hashlib.sha1(url.encode()).hexdigest()
+
     def generate_dict(self):
         return ((k, i.to_dict()) for k, i in self.__dct.items())
 
@@ -0,0 +1,77 @@
+"""Re-encodes the thumbnails of an existing cache with another codec.
+
+Example:
+    python -m ytm_qt.caching.migrate_thumbnails cache --format WEBP --quality 85
+"""
+
+import argparse
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from .thumbnails import ThumbnailCodec, write_atomic
+
+
+def thumbnail_files(cache_dir: Path) -> list[Path]:
+    """Every thumbnail and pyramid variant, skipping temporary files of unfinished writes."""
+    folder = cache_dir / "thumbnail"
+    if not folder.exists():
+        return []
+    return [p for p in folder.iterdir() if p.is_file() and not p.name.startswith(".")]
+
+
+def migrate(path: Path, codec: ThumbnailCodec, dry_run: bool = False) -> tuple[int, int]:
+    """Re-encodes one file. Returns its size before and after."""
+    content = path.read_bytes()
+    with Image.open(io.BytesIO(content)) as im:
+        if im.format == codec.format:
+            return len(content), len(content)
+        im.load()
+        if im.mode not in ("RGB", "RGBA", "L"):
+            im = im.convert("RGBA")
+        data = codec.encode(im)
+    if not dry_run:
+        write_atomic(path, data)
+    return len(content), len(data)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cache", type=Path, nargs="?", default=Path("cache"), help="The cache directory")
+    parser.add_argument("--format", choices=("WEBP", "JPEG", "PNG"), default=ThumbnailCodec.format)
+    parser.add_argument("--quality", type=int, default=ThumbnailCodec.quality)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="Only report how much space would be saved")
+    args = parser.parse_args(argv)
+
+    codec = ThumbnailCodec(args.format, args.quality)
+    files = thumbnail_files(args.cache)
+    before = after = failed = 0
+
+    def run(path: Path):
+        try:
+            return migrate(path, codec, args.dry_run)
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            return None
+
+    with ThreadPoolExecutor(args.workers) as pool:
+        for result in pool.map(run, files):
+            if result is None:
+                failed += 1
+                continue
+            before += result[0]
+            after += result[1]
+
+    print(
+        f"{'Would convert' if args.dry_run else 'Converted'} {len(files) - failed} thumbnails to {codec.format}:"
+        f" {before / 1024 / 1024:.1f} MiB -> {after / 1024 / 1024:.1f} MiB"
+        + (f", {failed} could not be read" if failed else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
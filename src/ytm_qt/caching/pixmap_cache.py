@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+from typing import NamedTuple
+
+from PySide6.QtGui import QImage, QPixmap
+
+
+class PixmapKey(NamedTuple):
+    path: str
+    mtime: int
+    size: int
+    dpr: float
+
+
+class PixmapCache:
+    """A least-recently-used cache of decoded images, shared by every view showing the same files.
+
+    Entries are keyed by path, modification time, size and device pixel ratio, so a rewritten
+    file is decoded again. Only use it from the GUI thread.
+
+    Args:
+        budget (int): The most bytes of decoded pixels to hold on to.
+    """
+
+    def __init__(self, budget: int = 32 * 1024 * 1024) -> None:
+        self.budget = budget
+        self.items: OrderedDict[PixmapKey, QPixmap] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    @cache
+    def get(cls):
+        return cls()
+
+    def key(self, path: Path, size: int, dpr: float = 1.0) -> PixmapKey | None:
+        """The key of the image at `path` fit to a `size` square, or None if the file doesn't exist."""
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return PixmapKey(str(path), mtime, size, dpr)
+
+    def find(self, key: PixmapKey) -> QPixmap | None:
+        if (pixmap := self.items.get(key)) is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+        return None
+
+    def insert_image(self, key: PixmapKey, image: QImage) -> QPixmap:
+        """Converts an image decoded by an `ImageDecoder` and caches it."""
+        pixmap = QPixmap.fromImage(image)
+        self.insert(key, pixmap)
+        return pixmap
+
+    def insert(self, key: PixmapKey, pixmap: QPixmap):
+        cost = _cost(pixmap)
+        if cost > self.budget:
+            return
+        if (old := self.items.pop(key, None)) is not None:
+            self.bytes -= _cost(old)
+        self.items[key] = pixmap
+        self.bytes += cost
+        while self.bytes > self.budget:
+            _, evicted = self.items.popitem(last=False)
+            self.bytes -= _cost(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self.items.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.items),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _cost(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
@@ -0,0 +1,181 @@
+import io
+import math
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+from contextlib import suppress
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import TypedDict
+
+from PIL import Image
+
+from ytm_qt.dicts import YTMThumbnail
+
+THUMBNAIL_SIZE = 128
+# The square sizes kept next to an item's full thumbnail, smallest first
+PYRAMID = (50, THUMBNAIL_SIZE)
+# How long a thumbnail is trusted when the server doesn't say
+DEFAULT_FRESHNESS = 7 * 24 * 60 * 60
+
+
+class ThumbnailValidators(TypedDict):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    expires: float  # unix time
+
+
+def freshness(headers: Mapping[str, str]) -> float:
+    """The seconds a response may be used without revalidating, from its Cache-Control or Expires."""
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-cache" in directives or "no-store" in directives:
+        return 0.0
+    age = int(a) if (a := headers.get("Age", "")).isdigit() else 0
+    if directives.get("max-age", "").isdigit():
+        return max(int(directives["max-age"]) - age, 0.0)
+    if (expires := headers.get("Expires")) is not None:
+        try:
+            date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+            return max(parsedate_to_datetime(expires).timestamp() - date, 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+    return DEFAULT_FRESHNESS
+
+
+def validators_from(
+    headers: Mapping[str, str], url: str, previous: ThumbnailValidators | None = None
+) -> ThumbnailValidators:
+    """Collects what is needed to revalidate a thumbnail. A 304 may leave out validators it didn't change."""
+    return {
+        "url": url,
+        "etag": headers.get("ETag") or (previous["etag"] if previous is not None else None),
+        "last_modified": headers.get("Last-Modified") or (previous["last_modified"] if previous is not None else None),
+        "expires": time.time() + freshness(headers),
+    }
+
+
+def conditional_headers(validators: ThumbnailValidators) -> dict[str, str]:
+    headers = {}
+    if validators["etag"] is not None:
+        headers["If-None-Match"] = validators["etag"]
+    if validators["last_modified"] is not None:
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def pyramid_level(px: int) -> int | None:
+    """The smallest pyramid level at least `px` wide, or None for the full image."""
+    return next((level for level in PYRAMID if level >= px), None)
+
+
+def variant_path(base: Path, level: int | None) -> Path:
+    return base if level is None else base.with_name(f"{base.name}@{level}")
+
+
+def existing_variant(base: Path, level: int | None) -> Path | None:
+    """Finds the smallest thumbnail on disk that is at least as large as `level`."""
+    levels = [lvl for lvl in PYRAMID if level is not None and lvl >= level]
+    for path in (*(variant_path(base, lvl) for lvl in levels), base):
+        if path.exists():
+            return path
+    return None
+
+
+def pick_source(thumbnails: list[YTMThumbnail], level: int | None) -> YTMThumbnail:
+    """Picks the smallest thumbnail whose shorter side still covers `level`, or the largest one."""
+    if level is not None:
+        covering = [t for t in thumbnails if min(t.get("width") or 0, t.get("height") or 0) >= level]
+        if covering:
+            return min(covering, key=lambda t: (t.get("width") or 0) * (t.get("height") or 0))
+    return max(
+        thumbnails,
+        key=lambda t: (t.get("height") or 0, t.get("width") or 0, t.get("preference") or 0),
+    )
+
+
+def square_thumbnail(content: bytes, size: int | None = THUMBNAIL_SIZE) -> Image.Image:
+    """Decodes an image, crops it to a centered square and scales it down to `size` in one pass.
+
+    JPEGs are decoded straight at 1/2, 1/4 or 1/8 scale when that still covers `size`.
+    """
+    im = Image.open(io.BytesIO(content))
+    width, height = im.size
+    smaller = min(width, height)
+    if size is not None and smaller > size:
+        scale = size / smaller
+        im.draft("RGB", (math.ceil(width * scale), math.ceil(height * scale)))
+        width, height = im.size
+        smaller = min(width, height)
+    if im.mode not in ("RGB", "RGBA", "L"):
+        # Palette and CMYK images can't be resampled or stored by every codec
+        im = im.convert("RGBA")
+
+    left = (width - smaller) // 2
+    top = (height - smaller) // 2
+    box = (left, top, left + smaller, top + smaller)
+    if size is not None and smaller > size:
+        return im.resize((size, size), Image.Resampling.LANCZOS, box=box, reducing_gap=2.0)
+    return im.crop(box)
+
+
+def write_atomic(path: Path, data: bytes):
+    """Writes to a temporary file next to `path` and renames it over, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+@dataclass(frozen=True)
+class ThumbnailCodec:
+    """How thumbnails are stored on disk. Readers sniff the format, so files of any codec can be mixed.
+
+    Args:
+        format (str): "WEBP", "JPEG" or "PNG".
+        quality (int): The lossy quality, 0-100. Ignored by PNG.
+    """
+
+    format: str = "WEBP"
+    quality: int = 85
+
+    def encode(self, im: Image.Image) -> bytes:
+        buf = io.BytesIO()
+        match self.format:
+            case "WEBP":
+                im.save(buf, "WEBP", quality=self.quality, method=4)
+            case "JPEG":
+                im.convert("RGB").save(buf, "JPEG", quality=self.quality, subsampling=0)
+            case "PNG":
+                im.save(buf, "PNG", compress_level=1)
+            case _:
+                raise ValueError(f"Unknown thumbnail format {self.format!r}")
+        return buf.getvalue()
+
+
+def save_thumbnail(im: Image.Image, path: Path, codec: ThumbnailCodec | None = None):
+    write_atomic(path, (codec or ThumbnailCodec()).encode(im))
+
+
+def save_pyramid(content: bytes, base: Path, level: int | None, codec: ThumbnailCodec | None = None) -> None:
+    """Saves the `level` variant of a thumbnail and every smaller level from a single decode."""
+    im = square_thumbnail(content, level)
+    if level is None:
+        save_thumbnail(im, base, codec)
+    for lvl in reversed(PYRAMID):
+        if level is not None and lvl > level:
+            continue
+        if im.width > lvl:
+            im = im.resize((lvl, lvl), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        save_thumbnail(im, variant_path(base, lvl), codec)
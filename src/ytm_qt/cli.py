@@ -0,0 +1,250 @@
+"""Downloads playlists, videos or a saved queue into the cache without opening the GUI.
+
+Example:
+    ytm-qt-dl "https://music.youtube.com/playlist?list=..." cache/queue.json --fetchers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Generator
+from datetime import timedelta
+from pathlib import Path
+from queue import Queue
+
+import orjson
+from PySide6.QtCore import QCoreApplication, QDeadlineTimer, QObject, QUrl, Slot
+
+from .caching import CacheHandler, CacheItem
+from .dicts import YTMDownloadResponse, YTMPlaylistResponse, YTMResponse, YTMSmallVideoResponse
+from .enums import ResponseTypes
+from .playlist_generators.song_ops import OperationSerializer, RecursiveSongOperation, SinglePlay, SongOperation
+from .settings import bandwidth_limits, opts
+from .telemetry import Telemetry
+from .threads.bandwidth import BandwidthScheduler, TrafficClass
+from .threads.download_pipeline import DownloadPipeline
+from .threads.retry import CircuitBreakers, FailureHandler
+from .threads.ytdlrunner import YoutubeDLProvider, YTDLUser, YTMDownload, YTMExtractInfo
+
+
+def queue_keys(op: SongOperation[str]) -> Generator[str, None, None]:
+    if isinstance(op, SinglePlay):
+        yield op.song
+    elif isinstance(op, RecursiveSongOperation):
+        for song in op.songs:
+            yield from queue_keys(song)
+
+
+class BulkDownloader(QObject):
+    """Resolves sources into cache items and feeds the missing ones to a `DownloadPipeline`.
+
+    Quits the application once every extraction and download has finished.
+    """
+
+    def __init__(
+        self,
+        cache: CacheHandler,
+        pipeline: DownloadPipeline,
+        ytdlp_queue: Queue[YTDLUser | None],
+        save_interval: float = 10.0,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.cache = cache
+        self.pipeline = pipeline
+        self.ytdlp_queue = ytdlp_queue
+        self.save_interval = save_interval
+        self.last_save = time.monotonic()
+
+        self.queued: set[str] = set()
+        self.pending_extractions = 0
+        self.pending_downloads = 0
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.failed_extractions = 0
+
+    def add_url(self, url: str):
+        request = YTMExtractInfo(url, parent=self)
+        request.processed.connect(self.info_extracted)
+        request.error.connect(self.extraction_failed)
+        request.finished.connect(self.extraction_finished)
+        self.pending_extractions += 1
+        self.ytdlp_queue.put(request)
+
+    def add_queue(self, path: Path):
+        with path.open("rb") as f:
+            ops = OperationSerializer.default().from_dict(orjson.loads(f.read()), lambda key: key)
+        for key in queue_keys(ops):
+            item = self.cache(key)
+            url = item.metadata["url"] if item.metadata is not None else f"https://music.youtube.com/watch?v={key}"
+            self.download(item, url)
+
+    def download(self, item: CacheItem, url: str):
+        if item.key in self.queued:
+            return
+        self.queued.add(item.key)
+        if item.audio.exists():
+            self.skipped += 1
+            return
+
+        request = YTMDownload(QUrl(url), item.audio, TrafficClass.BULK, parent=self)
+        request.processed.connect(self.downloaded_)
+        request.error.connect(self.download_failed)
+        request.finished.connect(self.download_finished)
+        self.pending_downloads += 1
+        self.pipeline.submit(request)
+
+    @Slot(YTMResponse)
+    def info_extracted(self, info: YTMResponse):
+        try:
+            response_type = ResponseTypes.from_extractor_key(info["extractor_key"])
+        except ValueError as e:
+            print(f"Skipping {info['webpage_url']}: {e}")
+            return
+        match response_type:
+            case ResponseTypes.PLAYLIST:
+                playlist: YTMPlaylistResponse = info  # type: ignore
+                entries = list(playlist["entries"])
+            case ResponseTypes.VIDEO:
+                entries = [{**info, "url": info["webpage_url"]}]
+            case _:
+                print(f"Skipping {info['webpage_url']}, {response_type.name.lower()} results can't be downloaded")
+                return
+
+        print(f"Queueing {len(entries)} songs from {info['webpage_url']}")
+        for entry in entries:
+            try:
+                item = CacheItem.from_ytmsvr(entry, self.cache)  # type: ignore
+            except KeyError as e:
+                print(f"Skipping an entry missing {e}")
+                continue
+            self.download(item, entry["url"])
+
+    @Slot(Exception)
+    def extraction_failed(self, e: Exception):
+        self.failed_extractions += 1
+        print(f"Failed to extract info: {e}")
+
+    @Slot()
+    def extraction_finished(self):
+        self.pending_extractions -= 1
+        self.check_done()
+
+    @Slot(YTMDownloadResponse)
+    def downloaded_(self, response: YTMDownloadResponse):
+        self.downloaded += 1
+        print(f"[{self.downloaded + self.failed}/{len(self.queued) - self.skipped}] {response['title']}")
+        if time.monotonic() - self.last_save > self.save_interval:
+            self.save()
+
+    @Slot(Exception)
+    def download_failed(self, e: Exception):
+        self.failed += 1
+
+    @Slot()
+    def download_finished(self):
+        self.pending_downloads -= 1
+        self.check_done()
+
+    def check_done(self):
+        if self.pending_extractions == 0 and self.pending_downloads == 0:
+            QCoreApplication.quit()
+
+    def save(self):
+        self.cache.save()
+        self.last_save = time.monotonic()
+
+
+def print_summary(downloader: BulkDownloader, telemetry: Telemetry, elapsed: float):
+    pools = telemetry.snapshot()["pools"]
+    fetched = pools["download/fetch"]["bytes"]
+    mib = fetched / 1024 / 1024
+    print()
+    print(
+        f"Downloaded {downloader.downloaded}, skipped {downloader.skipped}, failed {downloader.failed},"
+        f" unresolved {downloader.failed_extractions} in {timedelta(seconds=int(elapsed))}"
+    )
+    print(
+        f"Fetched {mib:.1f} MiB at {mib / elapsed if elapsed else 0:.2f} MiB/s,"
+        f" {downloader.downloaded / elapsed * 60 if elapsed else 0:.1f} songs/min"
+    )
+    print(f"{'stage':<24}{'done':>6}{'failed':>8}{'retried':>9}{'wait p50':>10}{'run p50':>10}{'run p95':>10}")
+    for name, pool in pools.items():
+        print(
+            f"{name:<24}{pool['completed']:>6}{pool['failed']:>8}{pool['retried']:>9}"
+            f"{pool['time_in_queue']['p50']:>9.2f}s{pool['time_in_service']['p50']:>9.2f}s"
+            f"{pool['time_in_service']['p95']:>9.2f}s"
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="ytm-qt-dl", description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="Playlist or video URLs, or paths to a saved queue.json")
+    parser.add_argument("--cache", type=Path, default=Path("cache"), help="The cache directory to fill")
+    parser.add_argument("--extractors", type=int, default=2, help="Concurrent metadata extractions")
+    parser.add_argument("--fetchers", type=int, default=3, help="Concurrent audio downloads")
+    parser.add_argument(
+        "--postprocessors", type=int, default=max((os.cpu_count() or 2) // 2, 1), help="Concurrent ffmpeg jobs"
+    )
+    parser.add_argument("--rate", type=float, default=None, help="Bandwidth limit in MiB/s")
+    parser.add_argument("--save-interval", type=float, default=10.0, help="Seconds between saves of the cache index")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication(sys.argv[:1])
+
+    cache = CacheHandler(args.cache)
+    cache.load()
+    ytdl_opts = {**opts, "outtmpl": {"default": str(args.cache / "%(id)s")}}
+
+    limits = {**bandwidth_limits, "class_rates": {**bandwidth_limits["class_rates"]}}
+    if args.rate is not None:
+        limits["class_rates"][TrafficClass.BULK] = args.rate * 1024 * 1024
+    breakers = CircuitBreakers()
+    telemetry = Telemetry()
+
+    ytdlp_queue: Queue[YTDLUser | None] = Queue()
+    ytdlp_failures: FailureHandler[YTDLUser] = FailureHandler(breakers)
+    ytdlp_stats = telemetry.pool("ytdl", ytdlp_queue.qsize)
+    providers = [YoutubeDLProvider(ytdl_opts, ytdlp_queue, ytdlp_failures, ytdlp_stats) for _ in range(2)]
+    pipeline = DownloadPipeline(
+        ytdl_opts,
+        workers={"extract": args.extractors, "fetch": args.fetchers, "postprocess": args.postprocessors},
+        scheduler=BandwidthScheduler(**limits),
+        breakers=breakers,
+        telemetry=telemetry,
+    )
+
+    downloader = BulkDownloader(cache, pipeline, ytdlp_queue, args.save_interval)
+    for source in args.sources:
+        if Path(source).is_file():
+            downloader.add_queue(Path(source))
+        else:
+            downloader.add_url(source)
+
+    started = time.perf_counter()
+    if downloader.pending_extractions or downloader.pending_downloads:
+        for provider in providers:
+            provider.start()
+        pipeline.start()
+        app.exec()
+
+        deadline = QDeadlineTimer(10_000)
+        for provider in providers:
+            provider.stop()
+        pipeline.stop()
+        for provider in providers:
+            if not provider.wait(deadline):
+                provider.terminate()
+                provider.wait()
+        if not pipeline.wait(deadline):
+            pipeline.terminate()
+
+    downloader.save()
+    print_summary(downloader, telemetry, time.perf_counter() - started)
+    sys.exit(1 if downloader.failed or downloader.failed_extractions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from collections.abc import Generator
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 # * These are mostly cut down from their original length! only ommiting useful information
 
@@ -114,4 +114,5 @@ class SongMetaData(TypedDict):
     artist: str
     url: str
     thumbnail: YTMThumbnail
+    thumbnails: NotRequired[list[YTMThumbnail]]  # every size available, to pick the smallest that fits
     audio_format: str | None
@@ -0,0 +1,57 @@
+import time
+from functools import cache
+
+import shiboken6
+from PySide6.QtCore import QObject, QRect, QTimer, Slot
+from PySide6.QtGui import QRegion
+from PySide6.QtWidgets import QWidget
+
+
+class AnimationClock(QObject):
+    """One timer for every animation painted by a delegate, instead of a `QVariantAnimation` per row.
+
+    Animations are functions of `now()`. While painting a row that is still moving, a delegate asks
+    for its rect to be painted again with `request`; the next tick repaints everything asked for in
+    one `update` per widget. Rows that aren't painted, because they're scrolled away or hidden, stop
+    asking, and once nothing asks the timer stops.
+
+    Args:
+        fps (int): How many frames a second are painted while something is animating.
+    """
+
+    def __init__(self, fps: int = 20, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // fps)
+        self.timer.timeout.connect(self._tick)
+        self.dirty: dict[QWidget, QRegion] = {}
+        self.ticks = 0
+
+    @classmethod
+    @cache
+    def get(cls):
+        return cls()
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+    def request(self, widget: QWidget, rect: QRect):
+        """Paints `rect` of `widget` again on the next tick."""
+        self.dirty[widget] = self.dirty.get(widget, QRegion()) | rect
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def active(self) -> bool:
+        return self.timer.isActive()
+
+    @Slot()
+    def _tick(self):
+        if not self.dirty:
+            self.timer.stop()
+            return
+        self.ticks += 1
+        dirty, self.dirty = self.dirty, {}
+        for widget, region in dirty.items():
+            if shiboken6.isValid(widget):
+                widget.update(region)
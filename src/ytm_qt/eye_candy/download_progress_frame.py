@@ -1,16 +1,28 @@
 import math
+from collections.abc import Callable
 from enum import Enum
+from functools import cache
+
+from PySide6.QtCore import QPointF, QRect, QRectF, Qt
+from PySide6.QtGui import QImage, QPainter, QPen, QPixmap
 
-from PySide6.QtCore import QEasingCurve, QPoint, QRect, Qt, QVariantAnimation
-from PySide6.QtGui import QPainter, QPaintEvent, QPen
-from PySide6.QtWidgets import QFrame, QWidget
 from ytm_qt.icons import Icons
 
+FADE_IN = 0.5
+REVEAL = 0.6
+FADE_OUT = 0.5
+LOOP = 2.0
+OVERLAY = 0.8
+
 
 def ball_func(x: float):
     return math.sin(math.radians(x) * math.pi)
 
 
+def out_expo(t: float) -> float:
+    return 1.0 if t >= 1 else 1 - 2 ** (-10 * t)
+
+
 class DownloadStatus(Enum):
     NOT_DOWNLOADED = 0
     DOWNLOADING = 1
@@ -18,133 +30,108 @@ class DownloadStatus(Enum):
     ERROR = 3
 
 
-class DownloadProgressFrame(QFrame):
-    def __init__(self, icons: Icons, parent: QWidget | None = None) -> None:
-        super().__init__(parent)
-
-        self.opacity_in = QVariantAnimation(self)
-        self.opacity_in.setDuration(500)
-        self.opacity_in.setStartValue(0)
-        self.opacity_in.setEndValue(80)
-        self.opacity_in.setEasingCurve(QEasingCurve.Type.OutExpo)
-        self.opacity_in.valueChanged.connect(self.set_value)
-        self.opacity_out = QVariantAnimation(self)
-        self.opacity_out.setDuration(500)
-        self.opacity_out.setStartValue(80)
-        self.opacity_out.setEndValue(0)
-        self.opacity_out.setEasingCurve(QEasingCurve.Type.OutExpo)
-        self.opacity_out.valueChanged.connect(self.set_value)
-        self.opacity_out.finished.connect(self.fade_out_finished)
-        self.opacity = 0.0
-
-        self.icons = icons
-        self.pm = icons.download_done.pixmap(64, 64)
-
-        self.reveal_checkmark = QVariantAnimation(self)
-        self.reveal_checkmark.setEasingCurve(QEasingCurve.Type.OutExpo)
-        self.reveal_checkmark.setDuration(600)
-        self.reveal_checkmark.setStartValue(0)
-        self.reveal_checkmark.setEndValue(100)
-        self.reveal_checkmark.valueChanged.connect(self.set_pm_visibility)
-        self.reveal_checkmark.finished.connect(self.opacity_out.start)
-        self.pm_visibility = 0.0
-
-        self.reveal_error = QVariantAnimation(self)
-        self.reveal_error.setEasingCurve(QEasingCurve.Type.OutExpo)
-        self.reveal_error.setDuration(600)
-        self.reveal_error.setStartValue(0)
-        self.reveal_error.setEndValue(100)
-        self.reveal_error.valueChanged.connect(self.set_pm_visibility)
-        self.err_visibility = 0
-
-        self.duration = QVariantAnimation(self)
-        self.duration.setDuration(2_000)
-        self.duration.setStartValue(0)
-        self.duration.setEndValue(100)
-        self.duration.setLoopCount(-1)
-        self.duration.valueChanged.connect(self.set_duration)
-        self.duration_v = 0.0
-
-        self.state = DownloadStatus.NOT_DOWNLOADED
-        self.progress = 0.0
-
-    def set_value(self, v: int):
-        self.opacity = v / 100
-        self.update()
-
-    def set_pm_visibility(self, v: int):
-        self.pm_visibility = v / 100
-        self.update()
-
-    def set_duration(self, v: int):
-        self.duration_v = v / 100
-        self.update()
-
-    def fade_out_finished(self):
-        self.pm_visibility = 0
-        self.duration.stop()
-
-    def paintEvent(self, event: QPaintEvent) -> None:
-        if self.opacity == 0:
-            return
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+class DownloadSprite:
+    """The moving parts of the download overlay, rendered once per size into strips of frames.
+
+    Painting a frame is then a single pixmap blit instead of antialiasing an arc and three dots.
+
+    Args:
+        size (int): The width and height of the thumbnail it's painted over.
+        dpr (float): The device pixel ratio it's painted at.
+    """
+
+    FRAMES = 40  # of the bouncing dots over one LOOP, a new one every tick of the AnimationClock
+    STEPS = 48  # of the progress arc
+
+    def __init__(self, size: int, dpr: float = 1.0) -> None:
+        self.size = size
+        self.dpr = dpr
+        self.px = math.ceil(size * dpr)
+        self.dots = self._strip(self.FRAMES, self._paint_dots)
+        self.arcs = self._strip(self.STEPS + 1, self._paint_arc)
+
+    @classmethod
+    @cache
+    def get(cls, size: int, dpr: float = 1.0):
+        return cls(size, dpr)
+
+    def _strip(self, frames: int, paint: Callable[[QPainter, float], None]) -> QPixmap:
+        image = QImage(self.px * frames, self.px, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setOpacity(self.opacity)
-        painter.fillRect(event.rect(), Qt.GlobalColor.black)
-        if self.pm_visibility > 0:
-            painter.drawPixmap(
-                QRect(
-                    0,
-                    0,
-                    int(self.pm_visibility * self.width()),
-                    self.height(),
-                ),
-                self.pm.copy(
-                    QRect(
-                        0,
-                        0,
-                        int(self.pm.width() * self.pm_visibility),
-                        self.pm.height(),
-                    )
-                ),
-            )
-        painter.setOpacity(1 - self.pm_visibility)
-        c = self.geometry().center()
-        painter.drawArc(
-            QRect(
-                c.x() - 20,
-                c.y() - 20,
-                c.x() + 15,
-                c.y() + 15,
-            ),
-            0,
-            int(self.progress * (16 * 360)),
+        painter.setPen(QPen(Qt.GlobalColor.white, 1.5))
+        painter.setBrush(Qt.GlobalColor.white)
+        for frame in range(frames):
+            painter.save()
+            painter.translate(frame * self.px, 0)
+            painter.scale(self.px / 50, self.px / 50)
+            paint(painter, frame / frames)
+            painter.restore()
+        painter.end()
+        return QPixmap.fromImage(image)
+
+    @staticmethod
+    def _paint_dots(painter: QPainter, t: float):
+        for n, dx in enumerate((-9, 0, 9)):
+            dy = ball_func(((t + (n - 1) * 0.1) % 1) * 360) * 3
+            painter.drawEllipse(QPointF(25 + dx, 25 + dy), 3, 3)
+
+    def _paint_arc(self, painter: QPainter, t: float):
+        # `t` only reaches 1 - 1/frames, so the last step is a full circle
+        progress = t * (self.STEPS + 1) / self.STEPS
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawArc(QRectF(5, 5, 40, 40), 90 * 16, -round(progress * 360 * 16))
+
+    def _frame(self, frame: int) -> QRect:
+        return QRect(frame * self.px, 0, self.px, self.px)
+
+    def paint(self, painter: QPainter, rect: QRect, progress: float, now: float):
+        arc = round(min(max(progress, 0.0), 1.0) * self.STEPS)
+        painter.drawPixmap(rect, self.arcs, self._frame(arc))
+        dots = int((now % LOOP) / LOOP * self.FRAMES)
+        painter.drawPixmap(rect, self.dots, self._frame(dots))
+
+
+def paint_download(
+    painter: QPainter,
+    rect: QRect,
+    status: DownloadStatus,
+    progress: float,
+    since: float,
+    now: float,
+    icons: Icons,
+) -> bool:
+    """Paints a song's download state over its thumbnail, `now - since` seconds after it changed to `status`.
+
+    Fades in a progress arc while downloading, reveals a checkmark and fades out once finished,
+    and reveals a warning on errors.
+
+    Returns:
+        bool: Whether it's still moving, so it has to be painted again on the next frame.
+    """
+    elapsed = now - since
+    if status == DownloadStatus.NOT_DOWNLOADED or (status == DownloadStatus.FINISHED and elapsed >= REVEAL + FADE_OUT):
+        return False
+
+    painter.save()
+    if status == DownloadStatus.DOWNLOADING:
+        painter.setOpacity(OVERLAY * out_expo(elapsed / FADE_IN))
+        painter.fillRect(rect, Qt.GlobalColor.black)
+        painter.setOpacity(1.0)
+        DownloadSprite.get(rect.width(), painter.device().devicePixelRatioF()).paint(painter, rect, progress, now)
+        animating = True
+    else:
+        finished = status == DownloadStatus.FINISHED
+        fade = 1 - out_expo(max(elapsed - REVEAL, 0) / FADE_OUT) if finished else 1.0
+        painter.setOpacity(OVERLAY * fade)
+        painter.fillRect(rect, Qt.GlobalColor.black)
+        painter.setOpacity(fade)
+        reveal = out_expo(elapsed / REVEAL)
+        painter.setClipRect(
+            QRect(rect.left(), rect.top(), round(rect.width() * reveal), rect.height()), Qt.ClipOperation.IntersectClip
         )
-        f1 = ball_func(((self.duration_v - 0.1) % 1) * 360) * 3
-        f2 = ball_func(self.duration_v * 360) * 3
-        f3 = ball_func(((self.duration_v + 0.1) % 1) * 360) * 3
-
-        painter.drawEllipse(QPoint(c.x() - 9, c.y() + int(f1)), 3, 3)
-        painter.drawEllipse(QPoint(c.x(), c.y() + int(f2)), 3, 3)
-        painter.drawEllipse(QPoint(c.x() + 9, c.y() + int(f3)), 3, 3)
-
-    def set_status(self, status: DownloadStatus):
-        self.state = status
-        if status == DownloadStatus.NOT_DOWNLOADED:
-            self.opacity_out.start()
-
-        elif status == DownloadStatus.DOWNLOADING:
-            self.opacity_in.start()
-            self.duration.start()
-        elif status == DownloadStatus.FINISHED:
-            self.reveal_checkmark.start()
-        elif status == DownloadStatus.ERROR:
-            print("Starting err")
-            self.pm = self.icons.warning.pixmap(64, 64)
-            self.reveal_error.start()
-
-    def update_progress(self, progress: float, update=False):  # 0..=1
-        self.progress = progress
-        if update:
-            self.update()
+        (icons.download_done if finished else icons.warning).paint(painter, rect)
+        animating = elapsed < (REVEAL + FADE_OUT if finished else REVEAL)
+    painter.restore()
+    return animating
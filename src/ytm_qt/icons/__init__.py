@@ -1,8 +1,11 @@
-from dataclasses import dataclass
 from functools import cache
 from pathlib import Path
 
-from PySide6.QtGui import QColor, QIcon, QImage, QPixmap, Qt
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QColor, QGuiApplication, QIcon, QImage, QPainter, QPixmap, Qt
+from PySide6.QtSvg import QSvgRenderer
+
+from ytm_qt.caching.thumbnails import write_atomic
 
 ICONS_PATH = Path(__file__).parent
 
@@ -12,78 +15,106 @@ def get_color(color: str) -> QColor:
     return QColor(color)
 
 
-@dataclass(frozen=True)
+class _Icon:
+    """An icon that is only rendered the first time it is read from an `Icons`."""
+
+    def __init__(self, *parts: str) -> None:
+        self.svg = Path(*parts)
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance: "Icons | None", owner: type) -> QIcon:
+        if instance is None:
+            return self  # type: ignore
+        icon = instance.render(self.svg)
+        # Shadows this descriptor, so later reads are plain attribute lookups
+        instance.__dict__[self.name] = icon
+        return icon
+
+
 class Icons:
-    play_button: QIcon
-    pause_button: QIcon
-    more_horiz: QIcon
-    more_vert: QIcon
-    next: QIcon
-    prev: QIcon
-    repeat: QIcon
-    repeat_bold: QIcon
-    repeat_one: QIcon
-    shuffle: QIcon
-    shuffle_bold: QIcon
-    group: QIcon
-    select: QIcon
-    deselect: QIcon
-    c_up: QIcon
-    c_down: QIcon
-    c_left: QIcon
-    c_right: QIcon
-    pan_zoom: QIcon
-    download_done: QIcon
-    warning: QIcon
+    """The app's icons in one color.
+
+    Icons are rendered when first used. With a `cache_dir`, the colored rasters are kept there per
+    color and device pixel ratio, so later launches only have to load a small PNG.
+    """
+
+    play_button = _Icon("playback", "play_arrow.svg")
+    pause_button = _Icon("playback", "pause.svg")
+    more_horiz = _Icon("more_horiz.svg")
+    more_vert = _Icon("more_vert.svg")
+    next = _Icon("arrows", "last_page.svg")
+    prev = _Icon("arrows", "first_page.svg")
+    repeat = _Icon("playback", "repeat_FILL1_wght400.svg")
+    repeat_bold = _Icon("playback", "repeat_FILL1_wght700.svg")
+    repeat_one = _Icon("playback", "repeat_one_FILL1_wght700.svg")
+    shuffle = _Icon("playback", "shuffle_FILL1_wght400.svg")
+    shuffle_bold = _Icon("playback", "shuffle_FILL1_wght700.svg")
+    group = _Icon("group.svg")
+    select = _Icon("select.svg")
+    deselect = _Icon("remove_selection.svg")
+    c_up = _Icon("arrows", "chevron_up.svg")
+    c_down = _Icon("arrows", "chevron_down.svg")
+    c_left = _Icon("arrows", "chevron_left.svg")
+    c_right = _Icon("arrows", "chevron_right.svg")
+    pan_zoom = _Icon("pan_zoom.svg")
+    download_done = _Icon("downloading", "done.svg")
+    warning = _Icon("warning.svg")
+
+    def __init__(self, color: str = "black", dpr: float | None = None, cache_dir: Path | None = None) -> None:
+        self.color = get_color(color)
+        if dpr is None:
+            screen = QGuiApplication.primaryScreen()
+            dpr = screen.devicePixelRatio() if screen is not None else 1.0
+        self.dpr = dpr
+        self.cache_dir = cache_dir
 
     @classmethod
     @cache
-    def get(cls, color: str = "black"):
-        col = get_color(color)
-
-        def google(p):
-            return render_icon(ICONS_PATH / "google" / p, col)
-
-        def arrows(p):
-            return google(Path("arrows") / p)
-
-        def downloading(p):
-            return google(Path("downloading") / p)
-
-        def gplay(p):
-            return google(Path("playback") / p)
-
-        return cls(
-            play_button=gplay("play_arrow.svg"),
-            pause_button=gplay("pause.svg"),
-            more_horiz=google("more_horiz.svg"),
-            more_vert=google("more_vert.svg"),
-            next=arrows("last_page.svg"),
-            prev=arrows("first_page.svg"),
-            repeat=gplay("repeat_FILL1_wght400.svg"),
-            repeat_bold=gplay("repeat_FILL1_wght700.svg"),
-            repeat_one=gplay("repeat_one_FILL1_wght700.svg"),
-            shuffle=gplay("shuffle_FILL1_wght400.svg"),
-            shuffle_bold=gplay("shuffle_FILL1_wght700.svg"),
-            group=google("group.svg"),
-            select=google("select.svg"),
-            deselect=google("remove_selection.svg"),
-            c_up=arrows("chevron_up.svg"),
-            c_down=arrows("chevron_down.svg"),
-            c_left=arrows("chevron_left.svg"),
-            c_right=arrows("chevron_right.svg"),
-            pan_zoom=google("pan_zoom.svg"),
-            download_done=downloading("done.svg"),
-            warning=google("warning.svg"),
-        )
-
-
-def render_icon(svg: Path, col: QColor) -> QIcon:
-    pixmap = QPixmap(str(svg))
-    mask = pixmap.createMaskFromColor(
-        get_color("black"),
-        Qt.MaskMode.MaskOutColor,
-    )
-    pixmap.fill(col)
-    pixmap.setMask(mask)
-    return QIcon(pixmap)
+    def get(cls, color: str = "black", cache_dir: Path | None = None):
+        return cls(color, cache_dir=cache_dir)
+
+    def render(self, svg: Path) -> QIcon:
+        source = ICONS_PATH / "google" / svg
+        if self.cache_dir is None:
+            return QIcon(QPixmap.fromImage(render_icon(source, self.color, self.dpr)))
+
+        cached = self.cache_dir / f"{self.color.name(QColor.NameFormat.HexArgb)[1:]}@{self.dpr:g}x" / svg
+        cached = cached.with_suffix(".png")
+        image = QImage()
+        # An edited SVG is newer than its raster and gets rendered again
+        if not (cached.exists() and cached.stat().st_mtime >= source.stat().st_mtime and image.load(str(cached))):
+            image = render_icon(source, self.color, self.dpr)
+            save_icon(image, cached)
+        image.setDevicePixelRatio(self.dpr)
+        return QIcon(QPixmap.fromImage(image))
+
+
+def render_icon(svg: Path, col: QColor, dpr: float = 1.0) -> QImage:
+    """Renders a monochrome SVG at its own size times `dpr`, painted over in `col`."""
+    renderer = QSvgRenderer(str(svg))
+    size = renderer.defaultSize() * dpr
+    image = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    renderer.render(painter)
+    # Keeps the shape and its antialiasing, but in the new color
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+    painter.fillRect(image.rect(), col)
+    painter.end()
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+def save_icon(image: QImage, path: Path):
+    """Writes the raster atomically, so a crash can't leave half a PNG in the cache."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, "PNG"):
+        return
+    try:
+        write_atomic(path, data.data())
+    except OSError as e:
+        print(f"Could not cache icon {path}: {e}")
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from operator import attrgetter
+from typing import overload
+
+_start = attrgetter("start")
+
+
+class _Block[T]:
+    __slots__ = ("items", "start")
+
+    def __init__(self, items: list[T], start: int = 0) -> None:
+        self.items = items
+        self.start = start
+
+
+class IndexedList[T]:
+    """A list that knows where each of its items is, so `index` doesn't scan it.
+
+    Items are kept in blocks of about `block_size`, and each item maps to its block. Finding an item,
+    inserting or removing one touches a single block, plus the start positions of the blocks after
+    it, which keeps a move inside a 10k song group to a few hundred steps instead of a pass over
+    the whole group. Reading by position is a bisect over the block starts; only slices are copied out.
+    Items have to be hashable and can only be in the list once.
+    """
+
+    def __init__(self, items: Iterable[T] = (), block_size: int = 256) -> None:
+        self.block_size = block_size
+        self.blocks: list[_Block[T]] = []
+        self.owner: dict[T, _Block[T]] = {}
+        self.size = 0
+        self.last = 0
+        self.insert_many(0, items)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[T]:
+        return chain.from_iterable(block.items for block in self.blocks)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.owner
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)})"
+
+    def _locate(self, i: int) -> tuple[int, int]:
+        """The block holding position `i`, and where in it. `i == len(self)` is the end of the last block."""
+        b = bisect_right(self.blocks, i, key=_start) - 1
+        return b, i - self.blocks[b].start
+
+    def _renumber(self, first: int):
+        start = 0 if first == 0 else self.blocks[first - 1].start + len(self.blocks[first - 1].items)
+        for block in islice(self.blocks, first, None):
+            block.start = start
+            start += len(block.items)
+
+    def _position(self, i: int) -> int:
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("IndexedList index out of range")
+        return i
+
+    @overload
+    def __getitem__(self, i: int) -> T: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[T]: ...
+
+    def __getitem__(self, i: int | slice) -> T | list[T]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.size)
+            if step != 1:
+                return list(self)[i]
+            if start >= stop:
+                return []
+            b, offset = self._locate(start)
+            items = chain.from_iterable(block.items for block in islice(self.blocks, b, None))
+            return list(islice(items, offset, offset + stop - start))
+        i = self._position(i)
+        # Views read rows in order, so the block of the last read usually holds this one too
+        block = self.blocks[self.last] if self.last < len(self.blocks) else self.blocks[0]
+        if not block.start <= i < block.start + len(block.items):
+            self.last, offset = self._locate(i)
+            return self.blocks[self.last].items[offset]
+        return block.items[i - block.start]
+
+    def index(self, item: T) -> int:
+        block = self.owner.get(item)
+        if block is None:
+            raise ValueError(f"{item!r} is not in list")
+        return block.start + block.items.index(item)
+
+    def insert(self, i: int, item: T):
+        self.insert_many(i, (item,))
+
+    def append(self, item: T):
+        self.insert_many(self.size, (item,))
+
+    def insert_many(self, i: int, items: Iterable[T]):
+        items = list(items)
+        if not items:
+            return
+        i = min(max(i + self.size if i < 0 else i, 0), self.size)
+        if not self.blocks:
+            self.blocks.append(_Block([]))
+        b, offset = self._locate(i)
+        block = self.blocks[b]
+        block.items[offset:offset] = items
+        for item in items:
+            self.owner[item] = block
+        self.size += len(items)
+        if len(block.items) > 2 * self.block_size:
+            # Split it back into blocks of block_size, so a bulk insert doesn't make one huge block
+            parts = [_Block(block.items[n : n + self.block_size]) for n in range(0, len(block.items), self.block_size)]
+            self.blocks[b : b + 1] = parts
+            for part in parts:
+                for item in part.items:
+                    self.owner[item] = part
+        self._renumber(b)
+
+    def pop(self, i: int = -1) -> T:
+        b, offset = self._locate(self._position(i))
+        block = self.blocks[b]
+        item = block.items.pop(offset)
+        del self.owner[item]
+        self.size -= 1
+        if not block.items and len(self.blocks) > 1:
+            del self.blocks[b]
+        self._renumber(b if b < len(self.blocks) else len(self.blocks) - 1)
+        return item
+
+    def remove(self, item: T):
+        self.pop(self.index(item))
+
+    def clear(self):
+        self.blocks.clear()
+        self.owner.clear()
+        self.size = 0
+
+    def check(self):
+        """Asserts that the blocks, their start positions and the item map agree with each other."""
+        start = 0
+        for block in self.blocks:
+            assert block.start == start, f"block starts at {block.start}, expected {start}"
+            assert block.items or len(self.blocks) == 1, "empty block left behind"
+            for item in block.items:
+                assert self.owner.get(item) is block, f"{item!r} is mapped to the wrong block"
+            start += len(block.items)
+        assert start == self.size, f"size is {self.size}, but the blocks hold {start}"
+        assert len(self.owner) == self.size, "item map holds items that were removed"
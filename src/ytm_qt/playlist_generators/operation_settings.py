@@ -1,7 +1,7 @@
 from abc import abstractmethod
 from typing import Self
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QHBoxLayout, QSpinBox, QWidget
 
 from .song_ops import (
@@ -12,6 +12,8 @@ from .song_ops import (
 
 
 class OperationSettings(QWidget):
+    changed = Signal()
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
 
@@ -32,6 +34,7 @@ class LNTSettings(OperationSettings):
         self.layout_ = QHBoxLayout(self)
         self.layout_.setContentsMargins(0, 0, 10, 0)
         self.layout_.addWidget(self.counter)
+        self.counter.valueChanged.connect(self.changed)
 
     def get_kwargs(self):
         return {
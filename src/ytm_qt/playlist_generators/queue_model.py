@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QAbstractItemModel, QMimeData, QModelIndex, QObject, QPersistentModelIndex, Qt, Signal, Slot
+
+from ytm_qt.eye_candy.download_progress_frame import DownloadStatus
+from ytm_qt.operation_dataclasses import OperationRequest, SongRequest
+from ytm_qt.song_widget.queue_song import QueueSong
+from ytm_qt.song_widget.song_delegate import DownloadedRole, DownloadRole, ItemRole, song_text
+from ytm_qt.song_widget.song_drag import SONG_KEYS_MIME, song_keys
+from ytm_qt.threads.ytdlrunner import YTMDownload
+
+from .indexed_list import IndexedList
+from .song_ops import PlayOnce, RecursiveSongOperation, SinglePlay, SongOperation
+
+if TYPE_CHECKING:
+    from ytm_qt import CacheHandler
+
+NodeRole = Qt.ItemDataRole.UserRole + 10
+# Views ask for flags all the time, and combining Qt's flags in Python isn't free
+ITEM_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+GROUP_FLAGS = ITEM_FLAGS | Qt.ItemFlag.ItemIsDropEnabled | Qt.ItemFlag.ItemIsEditable
+# Lets a QTreeView lay a song out without asking whether it has children or is expanded
+SONG_FLAGS = ITEM_FLAGS | Qt.ItemFlag.ItemNeverHasChildren
+# Carries nothing itself: a drag inside the queue moves the nodes the model remembers in `dragged`
+QUEUE_MIME = "application/x-ytm-qt-queue-nodes"
+
+
+class QueueNode:
+    def __init__(self, parent: OperationNode | None = None) -> None:
+        self.parent = parent
+
+
+class SongNode(QueueNode):
+    def __init__(self, song: QueueSong, parent: OperationNode | None = None) -> None:
+        super().__init__(parent)
+        self.song = song
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.song!r})"
+
+
+class OperationNode(QueueNode):
+    """A group in the queue, played with `mode` and its `settings`."""
+
+    def __init__(
+        self,
+        mode: type[RecursiveSongOperation] = PlayOnce,
+        settings: dict | None = None,
+        parent: OperationNode | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.mode = mode
+        self.settings = settings if settings is not None else {}
+        # Indexed, since rows are looked up for every index Qt asks about and every edit
+        self.children: IndexedList[QueueNode] = IndexedList()
+
+    def row_of(self, child: QueueNode) -> int:
+        return self.children.index(child)
+
+    def songs(self) -> Iterator[QueueSong]:
+        for child in self.children:
+            if isinstance(child, OperationNode):
+                yield from child.songs()
+            elif isinstance(child, SongNode):
+                yield child.song
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.mode.key()}, {self.children})"
+
+
+type Index = QModelIndex | QPersistentModelIndex
+
+
+class QueueModel(QAbstractItemModel):
+    """The play queue as a tree of groups and songs, for a `QTreeView` to show.
+
+    Every edit goes through the model, so a view only ever holds widgets for what it shows.
+    """
+
+    request_song = Signal(YTMDownload)
+
+    def __init__(self, cache_handler: CacheHandler, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.cache_handler = cache_handler
+        self.root = OperationNode()
+        self.dragged: list[QueueNode] = []
+        self.song_nodes: dict[QueueSong, SongNode] = {}
+
+    # Structure
+    def node(self, index: Index) -> QueueNode:
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index_of(self, node: QueueNode) -> QModelIndex:
+        if node.parent is None:
+            return QModelIndex()
+        return self.createIndex(node.parent.row_of(node), 0, node)
+
+    def index(self, row: int, column: int, parent: Index = QModelIndex()) -> QModelIndex:  # noqa: B008
+        node = parent.internalPointer() if parent.isValid() else self.root
+        if column or not isinstance(node, OperationNode) or not 0 <= row < node.children.size:
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index: Index = QModelIndex()) -> QModelIndex:  # type: ignore  # noqa: B008
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(self.node(index).parent or self.root)
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:  # noqa: B008
+        node = self.node(parent)
+        return len(node.children) if isinstance(node, OperationNode) else 0
+
+    def columnCount(self, parent: Index = QModelIndex()) -> int:  # noqa: B008
+        return 1
+
+    def hasChildren(self, parent: Index = QModelIndex()) -> bool:  # noqa: B008
+        return isinstance(self.node(parent), OperationNode)
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.node(index)
+        if role == NodeRole:
+            return node
+        if isinstance(node, SongNode):
+            song = node.song
+            if role == ItemRole:
+                return song.data
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+                return song_text(song.data)[0]
+            if role == DownloadRole:
+                if song.status == DownloadStatus.NOT_DOWNLOADED:
+                    return None
+                return song.status, song.progress, song.since
+            if role == DownloadedRole:
+                return song.status == DownloadStatus.FINISHED or song.data.audio.exists()
+        elif isinstance(node, OperationNode) and role == Qt.ItemDataRole.DisplayRole:
+            return node.mode.key()
+        return None
+
+    def setData(self, index: Index, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        """Groups take a `(mode, settings)` pair."""
+        node = self.node(index)
+        if role != Qt.ItemDataRole.EditRole or not isinstance(node, OperationNode):
+            return False
+        node.mode, node.settings = value
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index: Index) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return GROUP_FLAGS if isinstance(index.internalPointer(), OperationNode) else SONG_FLAGS
+
+    # Editing
+    def create_song(self, song: SongRequest) -> SongNode:
+        return SongNode(QueueSong(self.cache_handler[song.data.key]))
+
+    def create_node(self, request: SongRequest | OperationRequest) -> QueueNode:
+        if isinstance(request, SongRequest):
+            return self.create_song(request)
+        node = OperationNode(request.data_type, dict(request.data_config))  # type: ignore
+        self._attach(node, 0, [self.create_node(child) for child in request.songs])
+        return node
+
+    def from_operation(self, op: SongOperation[QueueSong]) -> QueueNode:
+        if isinstance(op, SinglePlay):
+            return SongNode(op.song)
+        assert isinstance(op, RecursiveSongOperation)
+        node = OperationNode(type(op), op.get_kwargs())
+        self._attach(node, 0, [self.from_operation(child) for child in op.songs])
+        return node
+
+    def insert(self, parent: OperationNode, row: int | None, nodes: Sequence[QueueNode]):
+        if not nodes:
+            return
+        row = len(parent.children) if row is None else row
+        self.beginInsertRows(self.index_of(parent), row, row + len(nodes) - 1)
+        self._attach(parent, row, nodes)
+        for node in nodes:
+            self._adopt(node)
+        self.endInsertRows()
+
+    def remove(self, node: QueueNode):
+        parent = node.parent
+        assert parent is not None
+        row = parent.row_of(node)
+        self.beginRemoveRows(self.index_of(parent), row, row)
+        parent.children.pop(row)
+        node.parent = None
+        self._release(node)
+        self.endRemoveRows()
+
+    def move(self, nodes: Iterable[QueueNode], parent: OperationNode, row: int | None):
+        """Moves `nodes` in order to `row` of `parent`, counted before any of them left."""
+        row = len(parent.children) if row is None else row
+        for node in nodes:
+            source = node.parent
+            assert source is not None
+            source_row = source.row_of(node)
+            if source is parent and source_row < row:
+                row -= 1
+            # Qt wants the row the node ends up before, counted while it is still in place
+            destination = row + 1 if source is parent and source_row <= row else row
+            if source is parent and destination in (source_row, source_row + 1):
+                row += 1
+                continue
+            if not self.beginMoveRows(
+                self.index_of(source), source_row, source_row, self.index_of(parent), destination
+            ):
+                continue
+            source.children.pop(source_row)
+            self._attach(parent, row, [node])
+            self.endMoveRows()
+            row += 1
+
+    def group(self, nodes: Sequence[QueueNode]) -> OperationNode | None:
+        """Puts `nodes` into a new group, where the first of them was."""
+        if not nodes or (parent := nodes[0].parent) is None:
+            return None
+        group = OperationNode()
+        self.insert(parent, parent.row_of(nodes[0]), [group])
+        self.move(nodes, group, None)
+        return group
+
+    def ungroup(self, group: OperationNode):
+        """Replaces a group with its contents."""
+        parent = group.parent
+        assert parent is not None
+        self.move(list(group.children), parent, parent.row_of(group))
+        self.remove(group)
+
+    def clear(self):
+        self.beginResetModel()
+        for node in self.root.children:
+            node.parent = None
+            self._release(node)
+        self.root.children.clear()
+        self.endResetModel()
+
+    def _attach(self, parent: OperationNode, row: int, nodes: Sequence[QueueNode]):
+        parent.children.insert_many(row, nodes)
+        for node in nodes:
+            node.parent = parent
+
+    def _adopt(self, node: QueueNode):
+        if isinstance(node, SongNode):
+            self.song_nodes[node.song] = node
+            node.song.request_song.connect(self.request_song)
+            node.song.changed.connect(self._song_changed)
+        elif isinstance(node, OperationNode):
+            for child in node.children:
+                self._adopt(child)
+
+    def _release(self, node: QueueNode):
+        """Disconnects `node` and everything in it from the model, and takes its groups apart.
+
+        A group and its children point at each other, so otherwise the songs in a removed group would
+        only be freed whenever the cycle collector next runs.
+        """
+        if isinstance(node, SongNode):
+            self.song_nodes.pop(node.song, None)
+            node.song.request_song.disconnect(self.request_song)
+            node.song.changed.disconnect(self._song_changed)
+        elif isinstance(node, OperationNode):
+            for child in node.children:
+                self._release(child)
+                child.parent = None
+            node.children.clear()
+
+    @Slot()
+    def _song_changed(self):
+        node = self.song_nodes.get(self.sender())  # type: ignore
+        if node is not None and node.parent is not None:
+            index = self.index_of(node)
+            self.dataChanged.emit(index, index, [DownloadRole, DownloadedRole])
+
+    def check(self):
+        """Asserts that every node's parent, every group's row index and `song_nodes` agree with the tree."""
+        assert self.root.parent is None, "root has a parent"
+        seen: set[int] = set()
+        songs: dict[QueueSong, SongNode] = {}
+        stack = [self.root]
+        while stack:
+            group = stack.pop()
+            group.children.check()
+            for row, child in enumerate(group.children):
+                assert id(child) not in seen, f"{child!r} is in the queue twice"
+                seen.add(id(child))
+                assert child.parent is group, f"{child!r} points at the wrong parent"
+                assert group.row_of(child) == row, f"{child!r} is indexed at the wrong row"
+                if isinstance(child, OperationNode):
+                    stack.append(child)
+                elif isinstance(child, SongNode):
+                    songs[child.song] = child
+        assert songs == self.song_nodes, "song_nodes doesn't match the songs in the queue"
+
+    # Playback
+    def generate_operations(self, node: OperationNode | None = None) -> RecursiveSongOperation[QueueSong]:
+        node = node or self.root
+        ops: list[SongOperation] = []
+        for child in node.children:
+            if isinstance(child, SongNode):
+                ops.append(SinglePlay(child.song))
+            elif isinstance(child, OperationNode):
+                ops.append(self.generate_operations(child))
+        return node.mode(ops, **node.settings)
+
+    # Drag and drop
+    def supportedDropActions(self) -> Qt.DropAction:
+        return Qt.DropAction.MoveAction | Qt.DropAction.CopyAction
+
+    def mimeTypes(self) -> list[str]:
+        return [QUEUE_MIME, SONG_KEYS_MIME]
+
+    def mimeData(self, indexes: Sequence[QModelIndex]) -> QMimeData:
+        return self.nodes_mime(self.node(index) for index in indexes if index.isValid())
+
+    def nodes_mime(self, nodes: Iterable[QueueNode]) -> QMimeData:
+        self.dragged = outermost(nodes)
+        mime = QMimeData()
+        mime.setData(QUEUE_MIME, b"")
+        return mime
+
+    def canDropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, column: int, parent: Index) -> bool:
+        target = self.node(parent)
+        if not isinstance(target, OperationNode):
+            return False
+        if data.hasFormat(QUEUE_MIME):
+            # A group can't go inside itself. Qt asks this on every mouse move, so it only climbs from the target
+            path = {target, *ancestors(target)}
+            return not any(node in path for node in self.dragged)
+        return data.hasFormat(SONG_KEYS_MIME)
+
+    def dropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, column: int, parent: Index) -> bool:
+        if not self.canDropMimeData(data, action, row, column, parent):
+            return False
+        target = self.node(parent)
+        assert isinstance(target, OperationNode)
+        if data.hasFormat(QUEUE_MIME):
+            dragged, self.dragged = self.dragged, []
+            self.move(dragged, target, None if row == -1 else row)
+            return True
+        songs = [SongRequest(self.cache_handler[key]) for key in song_keys(data) if key in self.cache_handler]
+        self.insert(target, None if row == -1 else row, [self.create_song(song) for song in songs])
+        return bool(songs)
+
+
+def ancestors(node: QueueNode) -> Iterator[OperationNode]:
+    while node.parent is not None:
+        node = node.parent
+        yield node
+
+
+def outermost(nodes: Iterable[QueueNode]) -> list[QueueNode]:
+    """`nodes` without the ones inside another of them, since a group's contents go wherever it goes."""
+    nodes = list(nodes)
+    selected = set(map(id, nodes))
+    return [n for n in nodes if not any(id(a) in selected for a in ancestors(n))]
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+from functools import partial
+
+from PySide6.QtCore import (
+    QAbstractItemModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QPoint,
+    QRect,
+    QSignalBlocker,
+    Qt,
+    Signal,
+    Slot,
+)
+from PySide6.QtGui import QDragLeaveEvent, QDragMoveEvent, QDropEvent, QPainter, QPaintEvent
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QFrame,
+    QHBoxLayout,
+    QSizePolicy,
+    QStyle,
+    QStyleOption,
+    QStyleOptionViewItem,
+    QTreeView,
+    QWidget,
+)
+
+from ytm_qt import Fonts, Icons
+from ytm_qt.song_widget.song_delegate import SongDelegate
+from ytm_qt.song_widget.song_drag import selected_rows, start_drag
+from ytm_qt.song_widget.thumbnail_loader import ThumbnailLoader
+
+from . import operation_settings
+from .queue_model import NodeRole, OperationNode, QueueModel, QueueNode
+from .song_ops import PlayOnce, RecursiveSongOperation, get_mode_icons
+
+type Index = QModelIndex | QPersistentModelIndex
+
+
+class OperationEditor(QWidget):
+    """Picks a group's mode and its settings. `changed` is emitted whenever either is edited."""
+
+    changed = Signal()
+
+    def __init__(self, icons: Icons, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.modes = get_mode_icons(icons)
+        self._mode_keys = {k.key(): k for k in self.modes}
+
+        self.mode: type[RecursiveSongOperation] = PlayOnce
+        self.mode_settings = operation_settings.get(self.mode).from_kwargs({}, self)
+        self.mode_settings.changed.connect(self.changed)
+
+        self.mode_dropdown = QComboBox(self)
+        self.mode_dropdown.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+        for operation, icon in self.modes.items():
+            self.mode_dropdown.addItem(icon, operation.key())
+        self.mode_dropdown.currentTextChanged.connect(self.change_mode)
+
+        self._layout = QHBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.addWidget(self.mode_dropdown)
+        self._layout.addWidget(self.mode_settings)
+        self._layout.addStretch()
+
+    @Slot(str)
+    def change_mode(self, t: str, kwargs: dict | None = None):
+        mode = self._mode_keys[t]
+        new_mode_settings = operation_settings.get(mode)
+        # intentionally subclass non-inclusive
+        if new_mode_settings is not type(self.mode_settings) or kwargs is not None:
+            self._layout.removeWidget(self.mode_settings)
+            self.mode_settings.deleteLater()
+            self.mode_settings = new_mode_settings.from_kwargs(kwargs or {}, self)
+            self.mode_settings.changed.connect(self.changed)
+            self._layout.insertWidget(1, self.mode_settings)
+        self.mode = mode
+
+        if self.mode_dropdown.currentText() != t:
+            self.mode_dropdown.setCurrentText(t)
+        self.changed.emit()
+
+    def set_operation(self, mode: type[RecursiveSongOperation], kwargs: dict):
+        """Shows `mode` and `kwargs` without emitting `changed`."""
+        if mode is self.mode and kwargs == self.get_kwargs():
+            return
+        with QSignalBlocker(self):
+            self.change_mode(mode.key(), kwargs)
+
+    def get_kwargs(self) -> dict:
+        return self.mode_settings.get_kwargs()
+
+
+class QueueDelegate(SongDelegate):
+    """Paints the play queue: songs like a `SongDelegate`, groups as their mode, settings and size.
+
+    Groups are edited in place with an `OperationEditor`.
+    """
+
+    def __init__(self, icons: Icons, fonts: Fonts, thumbnails: ThumbnailLoader, parent: QWidget | None = None):
+        super().__init__(icons, fonts, thumbnails, parent)
+        self.modes = get_mode_icons(icons)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: Index):
+        node = index.data(NodeRole)
+        if not isinstance(node, OperationNode):
+            super().paint(painter, option, index)
+            return
+        self.paint_background(painter, option)
+
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        size = self.thumbnails.size // 2
+        icon = QRect(rect.left(), rect.top() + (rect.height() - size) // 2, size, size)
+        if (mode_icon := self.modes.get(node.mode)) is not None:
+            mode_icon.paint(painter, icon)
+
+        settings = ", ".join(f"{k}={v}" for k, v in node.settings.items())
+        title = f"{node.mode.key()} ({settings})" if settings else node.mode.key()
+        count = f"{len(node.children)} item{'' if len(node.children) == 1 else 's'}"
+        text = rect.adjusted(size + 6, 0, 0, 0)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.save()
+        painter.setPen(option.palette.highlightedText().color() if selected else option.palette.text().color())
+        painter.setFont(self.fonts.playlist_entry_title)
+        painter.drawText(
+            text.adjusted(0, 0, 0, -text.height() // 2),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+            self.title_metrics.elidedText(title, Qt.TextElideMode.ElideRight, text.width()),
+        )
+        painter.setFont(self.fonts.playlist_entry_author)
+        painter.drawText(
+            text.adjusted(0, text.height() // 2, 0, 0),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+            count,
+        )
+        painter.restore()
+
+    def createEditor(self, parent: QWidget, option: QStyleOptionViewItem, index: Index) -> QWidget | None:
+        if not isinstance(index.data(NodeRole), OperationNode):
+            return None
+        editor = OperationEditor(self.icons, parent)
+        editor.setAutoFillBackground(True)
+        editor.changed.connect(partial(self.commitData.emit, editor))
+        return editor
+
+    def setEditorData(self, editor: QWidget, index: Index):
+        node = index.data(NodeRole)
+        if isinstance(editor, OperationEditor) and isinstance(node, OperationNode):
+            editor.set_operation(node.mode, node.settings)
+
+    def setModelData(self, editor: QWidget, model: QAbstractItemModel, index: Index):
+        if isinstance(editor, OperationEditor):
+            model.setData(index, (editor.mode, editor.get_kwargs()))
+
+    def updateEditorGeometry(self, editor: QWidget, option: QStyleOptionViewItem, index: Index):
+        editor.setGeometry(option.rect)
+
+
+class QueueView(QTreeView):
+    """The play queue's tree, moving rows around by drag and drop instead of copying them.
+
+    Dragging is handled here rather than by Qt, which repaints the whole viewport on every move of
+    the cursor and checks the row under it against the entire selection. Here a move only repaints
+    where the drop indicator was and where it is now.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setHeaderHidden(True)
+        # Every row is as tall as the first, so Qt never has to measure the others
+        self.setUniformRowHeights(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        # Drawn by the view itself, in paintEvent
+        self.setDropIndicatorShown(False)
+        self.drop_indicator = QRect()
+        self.verticalScrollBar().valueChanged.connect(self.hide_drop_indicator)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Sunken)
+
+    def rowsInserted(self, parent: Index, start: int, end: int):
+        super().rowsInserted(parent, start, end)
+        model = self.model()
+        assert isinstance(model, QueueModel)
+        group = model.node(parent)
+        assert isinstance(group, OperationNode)
+        for node in group.children[start : end + 1]:
+            if isinstance(node, OperationNode):
+                self.expand_groups(node)
+
+    def expand_groups(self, group: OperationNode):
+        """Expands `group` and the groups inside it.
+
+        `expandRecursively` would mark every song as expanded too, and Qt keeps a persistent index for
+        each of those, which it has to walk through on every move.
+        """
+        model = self.model()
+        assert isinstance(model, QueueModel)
+        stack = [group]
+        while stack:
+            group = stack.pop()
+            self.expand(model.index_of(group))
+            stack.extend(child for child in group.children if isinstance(child, OperationNode))
+
+    def startDrag(self, supportedActions: Qt.DropAction):
+        # The model moves the rows itself when they're dropped, so Qt mustn't remove them afterwards
+        model = self.model()
+        assert isinstance(model, QueueModel)
+        nodes: list[QueueNode] = []
+        for parent, top, bottom in selected_rows(self):
+            group = model.node(parent)
+            assert isinstance(group, OperationNode)
+            nodes.extend(group.children[top : bottom + 1])
+        if not nodes:
+            return
+        try:
+            start_drag(self, model.nodes_mime(nodes), len(nodes), supportedActions, Qt.DropAction.MoveAction)
+        finally:
+            # Cancelled, or dropped somewhere else; the nodes mustn't be moved by a later drop
+            model.dragged = []
+
+    def drop_target(self, pos: QPoint) -> tuple[QModelIndex, int, QRect]:
+        """Where a drop at `pos` goes, as the parent and row the model takes, and where to show it.
+
+        Every row is as tall as the first, so finding the one under `pos` is a division, however
+        long the queue is. A row of -1 means the end of the parent.
+        """
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return QModelIndex(), -1, QRect()
+        rect = self.visualRect(index)
+        if index.flags() & Qt.ItemFlag.ItemIsDropEnabled:
+            # Same margins as Qt's: the edges of a group put the drop next to it, the middle inside it
+            margin = max(2, min(round(rect.height() / 5.5), 12))
+            if margin <= pos.y() - rect.top() and margin <= rect.bottom() - pos.y():
+                return index, -1, rect
+            above = pos.y() - rect.top() < margin
+        else:
+            above = pos.y() < rect.center().y()
+        if above:
+            return index.parent(), index.row(), QRect(rect.left(), rect.top(), rect.width(), 0)
+        line = QRect(rect.left(), rect.bottom(), rect.width(), 0)
+        if self.isExpanded(index):
+            # The line is drawn above the group's first row, so that is where the drop goes
+            return index, 0, line
+        return index.parent(), index.row() + 1, line
+
+    def set_drop_indicator(self, rect: QRect):
+        if rect == self.drop_indicator:
+            return
+        viewport = self.viewport()
+        for dirty in (self.drop_indicator, rect):
+            if not dirty.isNull():
+                viewport.update(dirty.adjusted(-1, -2, 1, 2))
+        self.drop_indicator = rect
+
+    @Slot()
+    def hide_drop_indicator(self):
+        self.set_drop_indicator(QRect())
+
+    def dragMoveEvent(self, event: QDragMoveEvent):
+        pos = event.position().toPoint()
+        parent, row, rect = self.drop_target(pos)
+        if self.model().canDropMimeData(event.mimeData(), event.dropAction(), row, 0, parent):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+            rect = QRect()
+        self.set_drop_indicator(rect)
+        margin = self.autoScrollMargin()
+        if self.hasAutoScroll() and not self.viewport().rect().adjusted(margin, margin, -margin, -margin).contains(pos):
+            self.startAutoScroll()
+
+    def dragLeaveEvent(self, event: QDragLeaveEvent):
+        self.hide_drop_indicator()
+        super().dragLeaveEvent(event)
+
+    def dropEvent(self, event: QDropEvent):
+        parent, row, _ = self.drop_target(event.position().toPoint())
+        self.hide_drop_indicator()
+        self.stopAutoScroll()
+        self.setState(QAbstractItemView.State.NoState)
+        if self.model().dropMimeData(event.mimeData(), event.dropAction(), row, 0, parent):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
+    def paintEvent(self, event: QPaintEvent):
+        super().paintEvent(event)
+        if self.drop_indicator.isNull() or not event.rect().intersects(self.drop_indicator.adjusted(-1, -2, 1, 2)):
+            return
+        painter = QPainter(self.viewport())
+        option = QStyleOption()
+        option.initFrom(self)
+        option.rect = self.drop_indicator
+        self.style().drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorItemViewItemDrop, option, painter, self)
+        painter.end()
@@ -1,6 +1,6 @@
 from PySide6.QtCore import QObject, Signal
 
-from ytm_qt.song_widget.song_widget import SongWidget
+from ytm_qt.song_widget.queue_song import QueueSong
 
 from .song_ops import InfiniteLoopType, RecursiveSongOperation
 
@@ -13,10 +13,10 @@ class TrackManager(QObject):
         self.songops = songops
         self.__generator = songops.get()
         self.song_buffer = []
-        self.current_song: SongWidget | None = None
+        self.current_song: QueueSong | None = None
         self.current_index = -1
 
-    def move_next(self) -> SongWidget:
+    def move_next(self) -> QueueSong:
         self.current_index += 1
         if len(self.song_buffer) == self.current_index:
             ni = self.__add_to_buffer()
@@ -35,7 +35,7 @@ class TrackManager(QObject):
             self.position_changed.emit()
         return self.current_song
 
-    def get_next(self) -> SongWidget | None:
+    def get_next(self) -> QueueSong | None:
         if len(self.song_buffer) == self.current_index + 1:
             print("Next item has yet to be generated, generating now")
             try:
@@ -45,7 +45,7 @@ class TrackManager(QObject):
         else:
             return self.song_buffer[self.current_index + 1]
 
-    def get_previous(self) -> SongWidget | None:
+    def get_previous(self) -> QueueSong | None:
         if self.current_index <= 0:
             return None
         return self.song_buffer[self.current_index - 1]
@@ -55,7 +55,7 @@ class TrackManager(QObject):
         self.song_buffer.append(ni)
         return ni
 
-    def skip_until(self, song: SongWidget, timeout=-1):
+    def skip_until(self, song: QueueSong, timeout=-1):
         if self.songops.is_infinite() != InfiniteLoopType.NONE and timeout == -1:
             raise NotImplementedError("Infinite loops not implemented for skip_until")
 
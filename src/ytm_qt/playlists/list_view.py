@@ -1,86 +1,116 @@
 from __future__ import annotations
 
-from abc import abstractmethod
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import Signal
 from PySide6.QtGui import Qt
-from PySide6.QtWidgets import QFrame, QGridLayout, QScrollArea, QSizePolicy, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QAbstractItemView, QFrame, QGridLayout, QListView, QWidget
 
+from ytm_qt import Fonts, Icons
+from ytm_qt.song_widget.song_delegate import SongDelegate
+from ytm_qt.song_widget.song_drag import selected_rows, start_drag
+from ytm_qt.song_widget.thumbnail_loader import ThumbnailLoader
+from ytm_qt.song_widget.viewport_loader import ViewportLoader
 from ytm_qt.threads.download_icons import DownloadIcon
 
+from .playlist_model import PlaylistModel
+
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Sequence
+
+    from ytm_qt import CacheHandler, CacheItem
+
+
+class SongListView(QListView):
+    def startDrag(self, supportedActions: Qt.DropAction):
+        model = self.model()
+        assert isinstance(model, PlaylistModel)
+        rows = [row for _, top, bottom in selected_rows(self) for row in range(top, bottom + 1)]
+        if rows:
+            start_drag(self, model.rows_mime(rows), len(rows), supportedActions, Qt.DropAction.CopyAction)
 
-    from ytm_qt import CacheHandler
 
+class ListView(QWidget):
+    """A list of songs painted by a `SongDelegate`, so only the visible rows cost anything.
+
+    Args:
+        prefetch (float): How many viewport heights above and below the visible rows get thumbnails early.
+        release (float): How many viewport heights away a row's pending thumbnail is cancelled.
+    """
 
-class ListView[T: QWidget](QWidget):
     request_new_icon = Signal(DownloadIcon)
 
-    def __init__(self, parent: QWidget | None = None) -> None:
+    def __init__(
+        self,
+        icons: Icons | None = None,
+        fonts: Fonts | None = None,
+        prefetch: float = 1.0,
+        release: float = 4.0,
+        parent: QWidget | None = None,
+    ) -> None:
         super().__init__(parent)
-
-        self.widgets: list[T] = []
         self._other_lists: list[ListView] = []
         self.cache_handler = None
 
+        self.model = PlaylistModel(parent=self)
+        self.thumbnails = ThumbnailLoader(parent=self)
+        self.thumbnails.request_icon.connect(self.request_new_icon)
+
         self._layout = QGridLayout(self)
         self._layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self._layout)
-        self.scroll_area = QScrollArea(self)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll_area.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Sunken)
-        self.scroll_widget = QWidget(self)
-        self.box = QVBoxLayout(self.scroll_widget)
-        self.box.setContentsMargins(0, 0, 0, 0)
-        self.box.setSpacing(0)
-        self.scroll_widget.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Maximum)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(self.scroll_widget)
-        self._layout.addWidget(self.scroll_area)
-
-    def add_item(self, widget: T, idx=None):
-        if idx is None:
-            self.widgets.append(widget)
-            self.box.addWidget(widget)
-        else:
-            self.widgets.insert(idx, widget)
-            self.box.insertWidget(idx, widget)
-        self._add_connections(widget)
-
-    @abstractmethod
-    def _add_connections(self, widget: T): ...
-
-    def remove_item(self, item: T):
-        self.widgets.remove(item)
-        self.box.removeWidget(item)
-        item.hide()
-
-    def move_item(self, item: T, direction: int):
-        index: int = self.box.indexOf(item)
-        if index == -1 or direction == 0:
+        self.view = SongListView(self)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(SongDelegate(icons or Icons.get(), fonts or Fonts.get(), self.thumbnails, self.view))
+        # Every row is as tall as the first, so Qt never has to measure the others
+        self.view.setUniformItemSizes(True)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.view.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Sunken)
+        self.view.setDragEnabled(True)
+        self.view.setDragDropMode(QAbstractItemView.DragDropMode.DragOnly)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._layout.addWidget(self.view)
+        self.thumbnails.loaded.connect(self.view.viewport().update)
+        self.viewport_loader = ViewportLoader(self.view, self.thumbnails, prefetch, release, parent=self)
+
+    def add_item(self, item: CacheItem, idx: int | None = None):
+        self.add_items([item], idx)
+
+    def add_items(self, items: Sequence[CacheItem], idx: int | None = None):
+        self.model.insert_items(len(self.model.keys) if idx is None else idx, items)
+        self.viewport_loader.schedule()
+
+    def remove_item(self, item: CacheItem):
+        self.model.remove(self.model.keys.index(item.key))
+
+    def move_item(self, item: CacheItem, direction: int):
+        index = self.model.keys.index(item.key)
+        if direction == 0:
             return
 
-        new_index = min(max(index + direction, 0), self.box.count())
+        new_index = min(max(index + direction, 0), len(self.model.keys) - 1)
         if index == new_index:
             return
 
-        self.box.insertWidget(new_index, item)
-        self.widgets.insert(new_index, self.widgets.pop(index))
+        self.model.move(index, new_index)
 
     def clear(self):
-        for song in self.widgets.copy():
-            self.remove_item(song)
+        self.model.clear()
+        self.thumbnails.clear()
 
     def set_cache_handler(self, ch: CacheHandler):
         self.cache_handler = ch
+        self.model.cache_handler = ch
+
+    def items(self) -> list[CacheItem]:
+        return self.model.items()
 
     def __len__(self):
-        return len(self.widgets)
+        return len(self.model.keys)
 
     def register_other_list_views(self, lvs: Iterable[ListView]):
         self._other_lists.extend(lvs)
 
-    def has_item(self, item: T) -> bool:
-        return item in self.widgets
+    def has_item(self, item: CacheItem) -> bool:
+        return item.key in self.model.keys
@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (
     QDockWidget,
@@ -6,7 +8,6 @@ from PySide6.QtWidgets import (
 from ytm_qt import CacheHandler, CacheItem, Fonts
 from ytm_qt.dicts import YTMSmallVideoResponse
 from ytm_qt.icons import Icons
-from ytm_qt.song_widget.song_widget import SongWidget
 from ytm_qt.threads.download_icons import DownloadIcon
 
 from .list_view import ListView
@@ -24,21 +25,14 @@ class PlaylistDock[T: ListView](QDockWidget):
         self.cache_handler = cache_handler
         self.icons = icons
         self.setWidget(self.list)
+        # The list requests thumbnails for the rows near its viewport
+        self.list.request_new_icon.connect(self.request_new_icon)
 
     def add_song(self, dct: YTMSmallVideoResponse):
-        w = self._create_song(dct)
-        self.list.add_item(w)
-
-    def _create_song(self, dct: YTMSmallVideoResponse):
-        widget = SongWidget(
-            CacheItem.from_ytmsvr(dct, self.cache_handler),
-            playable=False,
-            icons=self.icons,
-            parent=self.list,
-        )
-        widget.request_icon.connect(self.request_new_icon)
-        widget.set_icon()
-        return widget
+        self.list.add_item(CacheItem.from_ytmsvr(dct, self.cache_handler))
+
+    def add_songs(self, dcts: Iterable[YTMSmallVideoResponse]):
+        self.list.add_items([CacheItem.from_ytmsvr(dct, self.cache_handler) for dct in dcts])
 
     def clear(self):
         self.list.clear()
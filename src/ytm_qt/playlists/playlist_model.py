@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QAbstractListModel, QMimeData, QModelIndex, QObject, QPersistentModelIndex, Qt
+
+from ytm_qt.song_widget.song_delegate import DownloadedRole, ItemRole, song_text
+from ytm_qt.song_widget.song_drag import SONG_KEYS_MIME, SongKeys
+
+if TYPE_CHECKING:
+    from ytm_qt import CacheHandler, CacheItem
+
+type Index = QModelIndex | QPersistentModelIndex
+
+
+class PlaylistModel(QAbstractListModel):
+    """A list of songs by cache key, resolved against the `CacheHandler` when a row is shown."""
+
+    def __init__(self, cache_handler: CacheHandler | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.cache_handler = cache_handler
+        self.keys: list[str] = []
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self.keys)
+
+    def item(self, row: int) -> CacheItem:
+        assert self.cache_handler is not None
+        return self.cache_handler[self.keys[row]]
+
+    def items(self) -> list[CacheItem]:
+        return [self.item(row) for row in range(len(self.keys))]
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self.cache_handler is None:
+            return None
+        item = self.item(index.row())
+        if role == ItemRole:
+            return item
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return song_text(item)[0]
+        if role == DownloadedRole:
+            return item.audio.exists()
+        return None
+
+    def flags(self, index: Index) -> Qt.ItemFlag:
+        flags = super().flags(index)
+        if index.isValid():
+            flags |= Qt.ItemFlag.ItemIsDragEnabled
+        return flags
+
+    def mimeTypes(self) -> list[str]:
+        return [SONG_KEYS_MIME]
+
+    def mimeData(self, indexes: Sequence[QModelIndex]) -> QMimeData:
+        return self.rows_mime(index.row() for index in indexes)
+
+    def rows_mime(self, rows: Iterable[int]) -> SongKeys:
+        # Keys only, in playlist order: the play queue looks the songs up in its cache
+        return SongKeys([self.keys[row] for row in sorted(set(rows))])
+
+    def supportedDragActions(self) -> Qt.DropAction:
+        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
+
+    def insert(self, row: int, item: CacheItem):
+        self.insert_items(row, [item])
+
+    def insert_items(self, row: int, items: Sequence[CacheItem]):
+        """Inserts every item at `row` with a single notification, instead of laying the view out once per item."""
+        if not items:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+        self.keys[row:row] = [item.key for item in items]
+        self.endInsertRows()
+
+    def remove(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.keys[row]
+        self.endRemoveRows()
+
+    def move(self, row: int, new_row: int):
+        # Qt wants the row the item goes before, counted before the move
+        if not self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), new_row + (new_row > row)):
+            return
+        self.keys.insert(new_row, self.keys.pop(row))
+        self.endMoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.keys.clear()
+        self.endResetModel()
@@ -1,6 +1,5 @@
-from functools import partial
-
 from PySide6.QtCore import (
+    QModelIndex,
     Qt,
     Signal,
     Slot,
@@ -12,19 +11,21 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from ..fonts import Fonts
+from ..icons import Icons
 from ..operation_dataclasses import OperationRequest, SongRequest
 from ..playlist_generators.song_ops import PlayOnce
-from ..song_widget.song_widget import SongWidget
 from .list_view import ListView
 
 
-class PlaylistView(ListView[SongWidget]):
+class PlaylistView(ListView):
     add_to_queue = Signal(SongRequest)
+    add_all_to_queue = Signal(list)  # of SongRequests, so the queue takes them in one go
     add_group = Signal(OperationRequest)
 
-    def __init__(self, parent: QWidget | None = None) -> None:
-        super().__init__(parent)
-        self.now_playing_widget: SongWidget | None = None
+    def __init__(self, icons: Icons | None = None, fonts: Fonts | None = None, parent: QWidget | None = None) -> None:
+        super().__init__(icons, fonts, parent=parent)
+        self.view.doubleClicked.connect(self._song_clicked)
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.ActionsContextMenu)
         self.add_to_queue_action = QAction(text="Add all to queue", parent=self)
@@ -34,22 +35,18 @@ class PlaylistView(ListView[SongWidget]):
         self.addAction(self.add_to_queue_action)
         self.addAction(self.add_as_group_action)
 
-    def _add_connections(self, widget: SongWidget):
-        widget.play.connect(partial(self._song_clicked, widget))
-
     def _add_all_to_queue(self):
-        for song in self.widgets:
-            self.add_to_queue.emit(song.request)
+        self.add_all_to_queue.emit([SongRequest(song) for song in self.items()])
 
     def _add_as_group(self):
         self.add_group.emit(
             OperationRequest(
                 PlayOnce,
                 {},
-                [SongRequest(song.data) for song in self.widgets],
+                [SongRequest(song) for song in self.items()],
             )
         )
 
-    @Slot(SongWidget)
-    def _song_clicked(self, song: SongWidget):
-        self.add_to_queue.emit(song.request)
+    @Slot(QModelIndex)
+    def _song_clicked(self, index: QModelIndex):
+        self.add_to_queue.emit(SongRequest(self.model.item(index.row())))
@@ -0,0 +1,44 @@
+from .caching.thumbnails import ThumbnailCodec
+from .threads.bandwidth import TrafficClass
+
+# Shared by the GUI and the headless downloader
+
+opts = {
+    "check_formats": "selected",
+    "extract_flat": "discard_in_playlist",
+    "format": "bestaudio/best",
+    "fragment_retries": 10,
+    # Errors have to reach the retry handlers, which tell transient ones apart by their cause
+    "ignoreerrors": False,
+    "outtmpl": {"default": "cache/%(id)s"},
+    "postprocessors": [
+        {
+            "key": "FFmpegExtractAudio",
+            "preferredquality": "5",
+        },
+        {
+            "key": "FFmpegConcat",
+            "only_multi_video": True,
+            "when": "playlist",
+        },
+    ],
+    "retries": 10,
+}
+
+# Bytes per second, None is unlimited.
+# Interactive traffic (now playing, thumbnails) is only bound by its own class limit,
+# background traffic (prefetch, bulk) also waits for the global and per-host limits.
+bandwidth_limits = {
+    "global_rate": None,
+    "host_rate": None,
+    "class_rates": {
+        TrafficClass.NOW_PLAYING: None,
+        TrafficClass.THUMBNAILS: None,
+        TrafficClass.PREFETCH: None,
+        TrafficClass.BULK: None,
+    },
+}
+
+# How downloaded thumbnails are stored. Existing caches can be converted with
+# `python -m ytm_qt.caching.migrate_thumbnails`
+thumbnail_codec = ThumbnailCodec("WEBP", quality=85)
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QUrl, Signal, Slot
+
+from ytm_qt import CacheItem
+from ytm_qt.dicts import YTMDownloadResponse
+from ytm_qt.eye_candy.animation_clock import AnimationClock
+from ytm_qt.eye_candy.download_progress_frame import DownloadStatus
+from ytm_qt.operation_dataclasses import SongRequest
+from ytm_qt.threads.bandwidth import TrafficClass
+from ytm_qt.threads.ytdlrunner import YTMDownload
+
+
+class QueueSong(QObject):
+    """A song in the play queue: what the `TrackManager` plays and what fetches its audio.
+
+    It isn't a widget, the queue view paints it from `status`, `progress` and when the status last changed.
+    `changed` is emitted when the status does; progress is picked up by the frames the view paints anyway.
+    """
+
+    request_song = Signal(YTMDownload)
+    song_gathered = Signal(Path)
+    changed = Signal()
+
+    def __init__(self, data: CacheItem, /, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.data = data
+        self.status = DownloadStatus.NOT_DOWNLOADED
+        self.progress = 0.0
+        self.since = 0.0
+        self.__song_requested: YTMDownload | None = None
+
+    @property
+    def data_id(self):
+        return self.data.key
+
+    @property
+    def data_title(self) -> str:
+        metadata = self.data.metadata
+        return (metadata["title"] if metadata is not None else None) or "???"
+
+    @property
+    def request(self):
+        return SongRequest(self.data)
+
+    @property
+    def filepath(self):
+        return self.data.audio
+
+    def set_status(self, status: DownloadStatus):
+        self.status = status
+        self.since = AnimationClock.now()
+        self.changed.emit()
+
+    def set_invalid(self):
+        self.set_status(DownloadStatus.ERROR)
+
+    def request_song_(self, traffic_class: TrafficClass = TrafficClass.PREFETCH):
+        if self.data.metadata is not None:
+            url = self.data.metadata["url"]
+        else:
+            url = f"https://music.youtube.com/watch?v={self.data.key}"
+            print(f"Metadata is None, assuming URL is {url}")
+
+        self.progress = 0.0
+        self.set_status(DownloadStatus.DOWNLOADING)
+        request = YTMDownload(QUrl(url), self.data.audio, traffic_class, parent=self)
+        request.processed.connect(self._song_gathered)
+        request.progress.connect(self._download_progress)
+        request.error.connect(self.set_invalid)
+        self.request_song.emit(request)
+        self.__song_requested = request
+
+    @Slot(dict)
+    def _download_progress(self, progress: dict):
+        if progress["status"] == "downloading" and (total := progress.get("total_bytes")) is not None:
+            self.progress = progress["downloaded_bytes"] / total
+
+    @Slot(YTMDownloadResponse)
+    def _song_gathered(self, response: YTMDownloadResponse):
+        # The download has already been committed to self.data.audio
+        self.song_gathered.emit(self.data.audio)
+        self.set_status(DownloadStatus.FINISHED)
+
+    def ensure_audio_exists(self, traffic_class: TrafficClass = TrafficClass.PREFETCH):
+        if self.data.audio.exists():
+            return
+        if self.__song_requested is None:
+            self.request_song_(traffic_class)
+        else:
+            # Promote a pending download, ex. when a prefetched song starts playing
+            self.__song_requested.promote(traffic_class)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.data_id!r}, {self.data_title!r})"
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from PySide6.QtCore import QModelIndex, QPersistentModelIndex, QRect, QSize, Qt
+from PySide6.QtGui import QFontMetrics, QPainter
+from PySide6.QtWidgets import QAbstractItemView, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QWidget
+
+from ytm_qt import CacheItem, Fonts, Icons
+from ytm_qt.eye_candy.animation_clock import AnimationClock
+from ytm_qt.eye_candy.download_progress_frame import paint_download
+
+from .thumbnail_loader import ThumbnailLoader
+
+ItemRole = Qt.ItemDataRole.UserRole + 1
+DownloadedRole = Qt.ItemDataRole.UserRole + 2
+DownloadRole = Qt.ItemDataRole.UserRole + 3  # (DownloadStatus, progress, when the status changed)
+
+
+def song_text(item: CacheItem) -> tuple[str, str]:
+    """The title of a song row, and its "author - duration" line."""
+    metadata = item.metadata
+    if metadata is None:
+        return "???", f"??? - {timedelta(seconds=0)}"
+    duration = timedelta(seconds=int(metadata["duration"] or -1))
+    return metadata["title"] or "???", f"{metadata['artist']} - {duration}"
+
+
+def exposed(painter: QPainter) -> QRect | None:
+    """The part of the device being repainted, in the painter's coordinates, or None if it's all of it."""
+    clip = painter.paintEngine().systemClip()
+    if clip.isEmpty():
+        return None
+    return painter.deviceTransform().inverted()[0].mapRect(clip.boundingRect())
+
+
+class SongDelegate(QStyledItemDelegate):
+    """Paints a song row: thumbnail, title, author and duration, and a mark once downloaded.
+
+    The model has to provide the `CacheItem` under `ItemRole`, and whether its audio exists under `DownloadedRole`.
+    Models that download songs can also provide `DownloadRole`, which is animated by the shared `AnimationClock`.
+    """
+
+    def __init__(self, icons: Icons, fonts: Fonts, thumbnails: ThumbnailLoader, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.icons = icons
+        self.fonts = fonts
+        self.thumbnails = thumbnails
+        self.clock = AnimationClock.get()
+        self.title_metrics = QFontMetrics(fonts.playlist_entry_title)
+        self.author_metrics = QFontMetrics(fonts.playlist_entry_author)
+        self.row_height = max(thumbnails.size, self.title_metrics.height() + self.author_metrics.height()) + 2
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex | QPersistentModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.row_height)
+
+    def paint_background(self, painter: QPainter, option: QStyleOptionViewItem):
+        style = option.widget.style() if option.widget is not None else None
+        if style is not None:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex | QPersistentModelIndex):
+        item: CacheItem | None = index.data(ItemRole)
+        if item is None:
+            return
+        self.paint_background(painter, option)
+
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        size = self.thumbnails.size
+        thumb = QRect(rect.left(), rect.top() + (rect.height() - size) // 2, size, size)
+        dpr = painter.device().devicePixelRatioF()
+        pixmap = self.thumbnails.pixmap(item, dpr)
+        if pixmap is not None:
+            painter.drawPixmap(thumb, pixmap)
+        else:
+            self.icons.more_horiz.paint(painter, thumb)
+
+        download = index.data(DownloadRole)
+        if download is not None and paint_download(painter, thumb, *download, self.clock.now(), self.icons):
+            if isinstance(option.widget, QAbstractItemView):
+                self.clock.request(option.widget.viewport(), thumb)
+        elif index.data(DownloadedRole):
+            mark = QRect(0, 0, size // 2, size // 2)
+            mark.moveBottomRight(thumb.bottomRight())
+            self.icons.download_done.paint(painter, mark)
+
+        text = rect.adjusted(size + 6, 0, 0, 0)
+        if (region := exposed(painter)) is not None and not region.intersects(text):
+            # An animation frame, which only repaints the thumbnail
+            return
+        title, author = song_text(item)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.save()
+        painter.setPen(option.palette.highlightedText().color() if selected else option.palette.text().color())
+        painter.setFont(self.fonts.playlist_entry_title)
+        painter.drawText(
+            text.adjusted(0, 0, 0, -text.height() // 2),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+            self.title_metrics.elidedText(title, Qt.TextElideMode.ElideRight, text.width()),
+        )
+        painter.setFont(self.fonts.playlist_entry_author)
+        painter.drawText(
+            text.adjusted(0, text.height() // 2, 0, 0),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+            self.author_metrics.elidedText(author, Qt.TextElideMode.ElideRight, text.width()),
+        )
+        painter.restore()
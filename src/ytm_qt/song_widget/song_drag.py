@@ -0,0 +1,121 @@
+from collections.abc import Iterator, Sequence
+from functools import cache
+
+from PySide6.QtCore import QByteArray, QMetaType, QMimeData, QModelIndex, QPoint, QRect, QSize, Qt
+from PySide6.QtGui import QColor, QCursor, QDrag, QFont, QFontMetrics, QPainter, QPixmap
+from PySide6.QtWidgets import QAbstractItemView, QApplication, QStyle, QStyleOptionViewItem
+
+# One cache key per line
+SONG_KEYS_MIME = "application/x-ytm-qt-song-keys"
+
+
+class SongKeys(QMimeData):
+    """Songs being dragged, by their cache keys, for the receiver to look up in its `CacheHandler`.
+
+    A view in this process reads `keys` off the object itself. The encoded form is only built if
+    another application asks for it.
+    """
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        super().__init__()
+        self.keys = keys
+
+    def formats(self) -> list[str]:
+        return [SONG_KEYS_MIME]
+
+    def hasFormat(self, mimetype: str) -> bool:
+        return mimetype == SONG_KEYS_MIME
+
+    def retrieveData(self, mimetype: str, preferredType: QMetaType) -> object:
+        if mimetype != SONG_KEYS_MIME:
+            return None
+        return QByteArray("\n".join(self.keys).encode())
+
+
+def song_keys(data: QMimeData) -> Sequence[str]:
+    if isinstance(data, SongKeys):
+        return data.keys
+    if not data.hasFormat(SONG_KEYS_MIME):
+        return []
+    return [key for key in data.data(SONG_KEYS_MIME).data().decode().split("\n") if key]
+
+
+@cache
+def count_badge(count: int, dpr: float) -> QPixmap:
+    """A pill with `count` in it, for the corner of a drag of several rows."""
+    font = QFont(QApplication.font())
+    font.setBold(True)
+    text = str(count)
+    metrics = QFontMetrics(font)
+    height = metrics.height() + 4
+    size = QSize(max(height, metrics.horizontalAdvance(text) + height // 2 + 4), height)
+    pixmap = QPixmap(size * dpr)
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    palette = QApplication.palette()
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(palette.highlight())
+    painter.drawRoundedRect(QRect(QPoint(0, 0), size), height / 2, height / 2)
+    painter.setPen(palette.highlightedText().color())
+    painter.setFont(font)
+    painter.drawText(QRect(QPoint(0, 0), size), Qt.AlignmentFlag.AlignCenter, text)
+    painter.end()
+    return pixmap
+
+
+def drag_pixmap(view: QAbstractItemView, index: QModelIndex, count: int) -> QPixmap:
+    """The row at `index` as its delegate paints it, with a badge for `count` when several rows are dragged.
+
+    Qt's own picture paints every selected row on screen. This one costs the same however much is
+    selected, and the row's thumbnail is already cached by the time it can be dragged.
+    """
+    size = view.visualRect(index).size()
+    dpr = view.devicePixelRatioF()
+    badge = count_badge(count, dpr) if count > 1 else None
+    badge_size = badge.deviceIndependentSize().toSize() if badge is not None else QSize()
+    pixmap = QPixmap(QSize(size.width() + badge_size.width() // 2, size.height() + badge_size.height() // 2) * dpr)
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    option = QStyleOptionViewItem()
+    view.initViewItemOption(option)
+    option.rect = QRect(QPoint(0, 0), size)
+    option.state |= QStyle.StateFlag.State_Selected
+    painter.setOpacity(0.8)
+    painter.fillRect(option.rect, QColor(option.palette.base().color()))
+    view.itemDelegateForIndex(index).paint(painter, option, index)
+    if badge is not None:
+        painter.setOpacity(1)
+        painter.drawPixmap(size.width() - badge_size.width() // 2, size.height() - badge_size.height() // 2, badge)
+    painter.end()
+    return pixmap
+
+
+def selected_rows(view: QAbstractItemView) -> Iterator[tuple[QModelIndex, int, int]]:
+    """The parent, first and last row of each range in the view's selection.
+
+    Views build their drags from these instead of `selectedIndexes()`, which takes ~90 ms to hand
+    10k selected rows over to Python.
+    """
+    for selected in view.selectionModel().selection():
+        yield selected.parent(), selected.top(), selected.bottom()
+
+
+def start_drag(view: QAbstractItemView, data: QMimeData, count: int, actions: Qt.DropAction, default: Qt.DropAction):
+    """Drags `data` out of the view, pictured by the row the drag started on and a badge for `count` rows.
+
+    Nothing is removed afterwards, unlike Qt's own `startDrag`. A view that moves rows moves them when they're dropped.
+    """
+    current = view.currentIndex()
+    if not view.selectionModel().isSelected(current):
+        parent, top, _ = next(selected_rows(view))
+        current = view.model().index(top, 0, parent)
+    drag = QDrag(view)
+    drag.setMimeData(data)
+    drag.setPixmap(drag_pixmap(view, current, count))
+    rect = view.visualRect(current)
+    cursor = view.viewport().mapFromGlobal(QCursor.pos()) - rect.topLeft()
+    drag.setHotSpot(QPoint(min(max(cursor.x(), 0), rect.width()), min(max(cursor.y(), 0), rect.height())))
+    drag.exec(actions, default)
@@ -0,0 +1,131 @@
+import math
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QUrl, Signal, Slot
+from PySide6.QtGui import QImage, QPixmap
+
+from ytm_qt.caching import CacheItem, PixmapCache, PixmapKey
+from ytm_qt.caching.thumbnails import ThumbnailValidators, existing_variant, pick_source, pyramid_level
+from ytm_qt.threads.decode_images import DecodeImage, ImageDecoder
+from ytm_qt.threads.download_icons import DownloadIcon
+
+
+class ThumbnailLoader(QObject):
+    """Loads thumbnails for item views, which paint rows instead of keeping a widget per song.
+
+    `pixmap` never blocks: it returns what the `PixmapCache` has and starts decoding or downloading
+    the rest, then `loaded` is emitted so the view can repaint. Work for rows that scrolled away is
+    dropped with `keep`.
+
+    Args:
+        size (int): The width and height thumbnails are painted at.
+    """
+
+    request_icon = Signal(DownloadIcon)
+    loaded = Signal()
+
+    def __init__(self, size: int = 50, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.size = size
+        # By thumbnail path, since items sharing artwork share the files too
+        self.keys: dict[Path, PixmapKey] = {}
+        self.decoding: dict[Path, DecodeImage] = {}
+        self.downloading: dict[Path, tuple[DownloadIcon, CacheItem]] = {}
+        self.failed: set[Path] = set()
+        self.revalidated: set[Path] = set()
+
+    def pixmap(self, item: CacheItem, dpr: float = 1.0) -> QPixmap | None:
+        path = item.thumbnail
+        pixmaps = PixmapCache.get()
+        if (key := self.keys.get(path)) is not None and key.dpr == dpr:
+            if (pixmap := pixmaps.find(key)) is not None:
+                return pixmap
+            # Evicted, decode it again
+            del self.keys[path]
+
+        if path in self.decoding or path in self.downloading:
+            return None
+        metadata = item.metadata
+        thumbnails = (metadata.get("thumbnails") or [metadata["thumbnail"]]) if metadata is not None else []
+        level = pyramid_level(math.ceil(self.size * dpr))
+        variant = existing_variant(path, level)
+        if variant is not None and (key := pixmaps.key(variant, self.size, dpr)) is not None:
+            if (pixmap := pixmaps.find(key)) is not None:
+                self.keys[path] = key
+                self._revalidate(item, thumbnails, level)
+                return pixmap
+            self.decoding[path] = ImageDecoder.get().decode(key, self._decoded)
+            self._revalidate(item, thumbnails, level)
+        elif thumbnails and path not in self.failed:
+            self._request(item, thumbnails, level)
+        return None
+
+    def keep(self, items: set[Path]):
+        """Cancels work for every thumbnail path not in `items`."""
+        for path in [p for p in self.decoding if p not in items]:
+            self.decoding.pop(path).cancel()
+        for path in [p for p in self.downloading if p not in items]:
+            self.downloading.pop(path)[0].cancel()
+
+    def clear(self):
+        self.keep(set())
+        self.keys.clear()
+        # A reload tries failed downloads again, in case they only failed for a moment
+        self.failed.clear()
+
+    def _revalidate(self, item: CacheItem, thumbnails: list, level: int | None):
+        """Asks the server whether a stale thumbnail changed, once per run."""
+        path = item.thumbnail
+        if path in self.revalidated or path in self.downloading or not thumbnails:
+            return
+        validators = item.thumbnail_validators(pick_source(thumbnails, level)["url"])
+        if validators is not None and validators["expires"] < time.time():
+            self.revalidated.add(path)
+            self._request(item, thumbnails, level)
+
+    def _request(self, item: CacheItem, thumbnails: list, level: int | None):
+        source = pick_source(thumbnails, level)
+        task = DownloadIcon(QUrl(source["url"]), item.thumbnail, level, item.thumbnail_validators(source["url"]))
+        task.finished.connect(self._downloaded)
+        task.error.connect(self._failed)
+        task.validated.connect(self._validated)
+        self.downloading[item.thumbnail] = (task, item)
+        self.request_icon.emit(task)
+
+    def _take_download(self) -> tuple[Path, CacheItem] | None:
+        for path, (task, item) in self.downloading.items():
+            if task is self.sender():
+                del self.downloading[path]
+                return path, item
+        return None
+
+    @Slot(QImage)
+    def _decoded(self, image: QImage):
+        task = self.sender()
+        path = next((p for p, t in self.decoding.items() if t is task), None)
+        if path is None:
+            return
+        del self.decoding[path]
+        PixmapCache.get().insert_image(task.key, image)  # type: ignore
+        self.keys[path] = task.key  # type: ignore
+        self.loaded.emit()
+
+    @Slot()
+    def _downloaded(self):
+        if (taken := self._take_download()) is not None:
+            # The next paint picks up the new file
+            self.keys.pop(taken[0], None)
+            self.loaded.emit()
+
+    @Slot(Exception)
+    def _failed(self, _e: Exception):
+        if (taken := self._take_download()) is not None:
+            self.failed.add(taken[0])
+
+    @Slot(dict)
+    def _validated(self, validators: ThumbnailValidators):
+        for task, item in self.downloading.values():
+            if task is self.sender():
+                item.set_thumbnail_validators(validators)
+                return
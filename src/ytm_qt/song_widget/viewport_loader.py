@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from PySide6.QtCore import QEvent, QModelIndex, QObject, QPersistentModelIndex, QTimer, Slot
+from PySide6.QtWidgets import QAbstractItemView, QTreeView
+
+from .song_delegate import ItemRole
+from .thumbnail_loader import ThumbnailLoader
+
+
+class ViewportLoader(QObject):
+    """Loads the thumbnails of the rows near the visible part of an item view, and cancels far away ones.
+
+    Args:
+        view (QAbstractItemView): The view painting the songs. Rows without an `ItemRole` are skipped.
+        thumbnails (ThumbnailLoader): The loader the view's delegate paints from.
+        prefetch (float): How many viewport heights above and below the visible rows are loaded early.
+        release (float): How many viewport heights away a row has to be to cancel its pending thumbnail.
+    """
+
+    def __init__(
+        self,
+        view: QAbstractItemView,
+        thumbnails: ThumbnailLoader,
+        prefetch: float = 1.0,
+        release: float = 4.0,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.view = view
+        self.thumbnails = thumbnails
+        self.prefetch = prefetch
+        self.release = release
+
+        # Scrolling and resizing fire in bursts, so only look once things settle
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(30)
+        self.timer.timeout.connect(self.update)
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+        view.viewport().installEventFilter(self)
+        # A downloaded thumbnail may belong to a prefetched row, which still has to be decoded
+        thumbnails.loaded.connect(self.schedule)
+
+    @Slot()
+    def schedule(self):
+        self.timer.start()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() in (QEvent.Type.Resize, QEvent.Type.Show):
+            self.schedule()
+        return False
+
+    def _step(self, index: QModelIndex | QPersistentModelIndex, direction: int) -> QModelIndex:
+        if isinstance(self.view, QTreeView):
+            return self.view.indexBelow(index) if direction > 0 else self.view.indexAbove(index)
+        return index.sibling(index.row() + direction, 0)
+
+    def rows(self, margin: float) -> Iterator[QModelIndex]:
+        """The shown rows within `margin` viewport heights of the visible ones, top to bottom."""
+        viewport = self.view.viewport().rect()
+        top = self.view.indexAt(viewport.topLeft())
+        if not top.isValid():
+            top = self.view.model().index(0, 0)
+            if not top.isValid():
+                return
+        extra = int(viewport.height() * margin)
+        index, height = top, 0
+        while height < extra and (above := self._step(index, -1)).isValid():
+            index = above
+            height += self.view.visualRect(index).height()
+        bottom = viewport.height() + extra
+        while index.isValid() and self.view.visualRect(index).top() <= bottom:
+            yield index
+            index = self._step(index, 1)
+
+    @Slot()
+    def update(self):
+        if not self.view.isVisible():
+            return
+        dpr = self.view.devicePixelRatioF()
+        for index in self.rows(self.prefetch):
+            if (item := index.data(ItemRole)) is not None:
+                self.thumbnails.pixmap(item, dpr)
+        self.thumbnails.keep(
+            {item.thumbnail for i in self.rows(self.release) if (item := i.data(ItemRole)) is not None}
+        )
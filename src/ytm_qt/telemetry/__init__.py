@@ -0,0 +1,2 @@
+from .stats import Histogram, PoolStats, Telemetry
+from .telemetry_dock import TelemetryDock
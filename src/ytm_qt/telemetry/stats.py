@@ -0,0 +1,151 @@
+import bisect
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import orjson
+
+from ytm_qt.threads.bandwidth import RateCounter
+
+# Bucket upper bounds in seconds, from 1ms doubling up to ~9 minutes
+BOUNDS = tuple(0.001 * 2**i for i in range(20))
+
+
+class Histogram:
+    """A fixed, log-scaled histogram of durations. Not thread-safe on its own."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def add(self, v: float):
+        self.counts[bisect.bisect_left(BOUNDS, v)] += 1
+        self.total += 1
+        self.sum += v
+
+    def percentile(self, q: float) -> float:
+        """The upper bound of the bucket containing the `q` (0..=1) quantile."""
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        seen = 0
+        for bound, n in zip(BOUNDS, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.total,
+            "mean": self.sum / self.total if self.total else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": {str(b): n for b, n in zip((*BOUNDS, "inf"), self.counts) if n},
+        }
+
+
+class PoolStats:
+    """Counters for a pool of workers, cheap enough to update from every job.
+
+    Args:
+        name (str): The name shown in the telemetry panel.
+        depth (Callable[[], int] | None): Reads the amount of queued jobs when a snapshot is taken.
+    """
+
+    def __init__(self, name: str, depth: Callable[[], int] | None = None) -> None:
+        self.name = name
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.wait = Histogram()
+        self.service = Histogram()
+        self.bytes = RateCounter()
+
+    def started(self, queued_at: float) -> float:
+        """Marks a job as picked up. Returns the start time to pass to `finished`."""
+        now = time.perf_counter()
+        with self.lock:
+            self.active += 1
+            self.wait.add(now - queued_at)
+        return now
+
+    def finished(self, started: float, ok: bool = True, retrying: bool = False):
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.active -= 1
+            self.service.add(elapsed)
+            if ok:
+                self.completed += 1
+            elif retrying:
+                self.retried += 1
+            else:
+                self.failed += 1
+
+    def add_failure(self):
+        """Counts a job that failed without being started."""
+        with self.lock:
+            self.failed += 1
+
+    def add_bytes(self, n: int):
+        if n > 0:
+            with self.lock:
+                self.bytes.add(n, time.monotonic())
+
+    def progress_hook(self) -> Callable[[dict], None]:
+        """Creates a YoutubeDL progress hook counting the bytes of the download it is attached to."""
+        last = {"bytes": 0}
+
+        def hook(progress: dict):
+            if progress["status"] == "downloading":
+                downloaded = progress.get("downloaded_bytes") or 0
+                self.add_bytes(downloaded - last["bytes"])
+                last["bytes"] = downloaded
+
+        return hook
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "queued": self.depth() if self.depth is not None else 0,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retried": self.retried,
+                "bytes": self.bytes.total,
+                "bytes_per_sec": self.bytes.rate(time.monotonic()),
+                "time_in_queue": self.wait.to_dict(),
+                "time_in_service": self.service.to_dict(),
+            }
+
+
+class Telemetry:
+    """Collects the stats of every worker pool, plus any extra sources, into one snapshot."""
+
+    def __init__(self) -> None:
+        self.pools: dict[str, PoolStats] = {}
+        self.sources: dict[str, Callable[[], object]] = {}
+
+    def pool(self, name: str, depth: Callable[[], int] | None = None) -> PoolStats:
+        if name not in self.pools:
+            self.pools[name] = PoolStats(name, depth)
+        return self.pools[name]
+
+    def add_source(self, name: str, source: Callable[[], object]):
+        self.sources[name] = source
+
+    def snapshot(self) -> dict:
+        return {
+            "time": time.time(),
+            "pools": {name: pool.snapshot() for name, pool in self.pools.items()},
+            **{name: source() for name, source in self.sources.items()},
+        }
+
+    def dump(self, path: Path):
+        with path.open("wb") as f:
+            f.write(orjson.dumps(self.snapshot(), option=orjson.OPT_INDENT_2))
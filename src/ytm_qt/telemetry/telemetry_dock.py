@@ -0,0 +1,116 @@
+import time
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtWidgets import (
+    QDockWidget,
+    QFileDialog,
+    QGridLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QWidget,
+)
+
+from .stats import Telemetry
+
+COLUMNS = ("queued", "active", "done", "failed", "retried", "KiB/s", "wait p50", "wait p95", "run p50", "run p95")
+
+
+def _fmt_seconds(s: float) -> str:
+    if s == float("inf"):
+        return "inf"
+    return f"{s * 1000:.0f}ms" if s < 1 else f"{s:.1f}s"
+
+
+class TelemetryWidget(QWidget):
+    def __init__(self, telemetry: Telemetry, dump_dir: Path, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self.dump_dir = dump_dir
+
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.bandwidth_label = QLabel(self)
+        self.breakers_label = QLabel(self)
+        self.pixmaps_label = QLabel(self)
+        self.dump_button = QPushButton("Dump JSON", self)
+        self.dump_button.clicked.connect(self.dump)
+
+        self.layout_ = QGridLayout(self)
+        self.layout_.setContentsMargins(0, 0, 0, 0)
+        self.layout_.addWidget(self.table, 0, 0, 1, 2)
+        self.layout_.addWidget(self.bandwidth_label, 1, 0)
+        self.layout_.addWidget(self.dump_button, 1, 1, 3, 1)
+        self.layout_.addWidget(self.breakers_label, 2, 0)
+        self.layout_.addWidget(self.pixmaps_label, 3, 0)
+
+        # Only poll while the panel can be seen
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        self.refresh()
+        self.timer.start()
+        return super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        self.timer.stop()
+        return super().hideEvent(event)
+
+    @Slot()
+    def refresh(self):
+        snapshot = self.telemetry.snapshot()
+        pools: dict[str, dict] = snapshot["pools"]
+        self.table.setRowCount(len(pools))
+        self.table.setVerticalHeaderLabels(list(pools))
+        for row, pool in enumerate(pools.values()):
+            values = (
+                pool["queued"],
+                pool["active"],
+                pool["completed"],
+                pool["failed"],
+                pool["retried"],
+                f"{pool['bytes_per_sec'] / 1024:.0f}",
+                _fmt_seconds(pool["time_in_queue"]["p50"]),
+                _fmt_seconds(pool["time_in_queue"]["p95"]),
+                _fmt_seconds(pool["time_in_service"]["p50"]),
+                _fmt_seconds(pool["time_in_service"]["p95"]),
+            )
+            for col, v in enumerate(values):
+                item = QTableWidgetItem(str(v))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+        if (bandwidth := snapshot.get("bandwidth")) is not None:
+            self.bandwidth_label.setText(
+                "  ".join(f"{name}: {rate / 1024:.0f} KiB/s" for name, rate in bandwidth.items())
+            )
+        if (paused := snapshot.get("paused_hosts")) is not None:
+            self.breakers_label.setText(f"paused hosts: {', '.join(paused) or 'none'}")
+        if (pixmaps := snapshot.get("pixmaps")) is not None:
+            self.pixmaps_label.setText(
+                f"pixmaps: {pixmaps['entries']} cached, {pixmaps['bytes'] / 1024 / 1024:.1f} MiB,"
+                f" {pixmaps['hits']} hits, {pixmaps['misses']} misses ({pixmaps['hit_rate']:.0%})"
+            )
+
+    @Slot()
+    def dump(self):
+        if not self.dump_dir.exists():
+            self.dump_dir.mkdir(parents=True)
+        default = self.dump_dir / f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path, _ = QFileDialog.getSaveFileName(self, "Dump telemetry", str(default), "JSON (*.json)")
+        if path:
+            self.telemetry.dump(Path(path))
+            print(f"Dumped telemetry to {path}")
+
+
+class TelemetryDock(QDockWidget):
+    def __init__(self, telemetry: Telemetry, dump_dir: Path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Downloads")
+        self.telemetry_widget = TelemetryWidget(telemetry, dump_dir, self)
+        self.setWidget(self.telemetry_widget)
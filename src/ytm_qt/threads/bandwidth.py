@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+from urllib.parse import urlsplit
+
+
+class TrafficClass(Enum):
+    """The kinds of transfers competing for the link, ordered by priority."""
+
+    NOW_PLAYING = 0
+    THUMBNAILS = 1
+    PREFETCH = 2
+    BULK = 3
+
+    @property
+    def interactive(self) -> bool:
+        return self in (TrafficClass.NOW_PLAYING, TrafficClass.THUMBNAILS)
+
+
+class TokenBucket:
+    """A token bucket that is allowed to go into debt.
+
+    `reserve` always takes the tokens and returns how long the caller has to sleep
+    until the bucket is back out of debt. A rate of None never limits anything.
+    """
+
+    def __init__(self, rate: float | None, burst: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else (rate or 0)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+
+    def refill(self, now: float):
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def reserve(self, n: float) -> float:
+        if self.rate is None:
+            return 0.0
+        self.tokens -= n
+        return max(-self.tokens / self.rate, 0.0)
+
+
+class RateCounter:
+    """Counts bytes over a sliding window to estimate the current throughput."""
+
+    def __init__(self, window: float = 5.0) -> None:
+        self.window = window
+        self.total = 0
+        self.samples: deque[tuple[float, int]] = deque()
+
+    def add(self, n: int, now: float):
+        self.total += n
+        self.samples.append((now, n))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        while self.samples and self.samples[0][0] < now - self.window:
+            self.samples.popleft()
+
+    def rate(self, now: float) -> float:
+        self._prune(now)
+        return sum(n for _, n in self.samples) / self.window
+
+
+class BandwidthScheduler:
+    """Shares the available bandwidth between every downloader.
+
+    Every transfer is limited by the bucket of its traffic class. Background classes also
+    have to wait for the global and per-host buckets, while interactive ones only take from
+    them. That way now-playing audio and thumbnails are never held back by a bulk download,
+    and bulk downloads use whatever is left over.
+
+    Args:
+        global_rate (float | None): Bytes per second for all traffic combined.
+        host_rate (float | None): Bytes per second for a single host.
+        class_rates (dict[TrafficClass, float | None] | None): Bytes per second per traffic class.
+    """
+
+    def __init__(
+        self,
+        global_rate: float | None = None,
+        host_rate: float | None = None,
+        class_rates: dict[TrafficClass, float | None] | None = None,
+    ) -> None:
+        class_rates = class_rates or {}
+        self.lock = threading.Lock()
+        self.global_bucket = TokenBucket(global_rate)
+        self.host_rate = host_rate
+        self.host_buckets: dict[str, TokenBucket] = {}
+        self.class_buckets = {tc: TokenBucket(class_rates.get(tc)) for tc in TrafficClass}
+        self.counters = {tc: RateCounter() for tc in TrafficClass}
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        if host not in self.host_buckets:
+            self.host_buckets[host] = TokenBucket(self.host_rate)
+        return self.host_buckets[host]
+
+    def acquire(self, traffic_class: TrafficClass, host: str, n: int):
+        """Accounts `n` transferred bytes, and blocks the calling thread if they went over a limit."""
+        if n <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            shared = (self.global_bucket, self._host_bucket(host))
+            own = self.class_buckets[traffic_class]
+            for bucket in (*shared, own):
+                bucket.refill(now)
+
+            delay = own.reserve(n)
+            if traffic_class.interactive:
+                for bucket in shared:
+                    bucket.reserve(n)
+            else:
+                delay = max(delay, *(bucket.reserve(n) for bucket in shared))
+            self.counters[traffic_class].add(n, now)
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def progress_hook(self, traffic_class: Callable[[], TrafficClass]) -> Callable[[dict], None]:
+        """Creates a YoutubeDL progress hook that throttles the download it is attached to.
+
+        Args:
+            traffic_class (Callable[[], TrafficClass]): Read on every chunk, so a transfer can change class midway.
+        """
+        last = {"bytes": 0}
+
+        def hook(progress: dict):
+            if progress["status"] != "downloading":
+                return
+            downloaded = progress.get("downloaded_bytes") or 0
+            n, last["bytes"] = downloaded - last["bytes"], downloaded
+            host = urlsplit(progress.get("info_dict", {}).get("url", "")).hostname or ""
+            self.acquire(traffic_class(), host, n)
+
+        return hook
+
+    def throughput(self) -> dict[str, float]:
+        """The bytes per second of every traffic class over the last few seconds."""
+        with self.lock:
+            now = time.monotonic()
+            return {tc.name.lower(): counter.rate(now) for tc, counter in self.counters.items()}
+
+    def totals(self) -> dict[str, int]:
+        with self.lock:
+            return {tc.name.lower(): counter.total for tc, counter in self.counters.items()}
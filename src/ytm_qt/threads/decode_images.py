@@ -0,0 +1,79 @@
+import os
+from collections.abc import Callable
+from functools import cache
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader
+
+from ytm_qt.caching.pixmap_cache import PixmapKey
+
+
+class DecodeImage(QObject):
+    """A request to decode an image off the GUI thread.
+
+    Cancelling skips the decode if it hasn't started yet. A result already on its way can still
+    arrive, so receivers should check that the request is the one they are waiting for.
+    """
+
+    decoded = Signal(QImage)
+
+    def __init__(self, key: PixmapKey, parent=None) -> None:
+        super().__init__(parent)
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def decode_image(key: PixmapKey) -> QImage:
+    """Reads the image at `key.path`, scaled down while decoding to fit a `key.size` square."""
+    reader = QImageReader(key.path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    target = round(key.size * key.dpr)
+    if size.isValid() and max(size.width(), size.height()) > target:
+        reader.setScaledSize(size.scaled(QSize(target, target), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    image.setDevicePixelRatio(key.dpr)
+    return image
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, request: DecodeImage) -> None:
+        super().__init__()
+        self.request = request
+
+    def run(self):
+        if self.request.cancelled:
+            return
+        image = decode_image(self.request.key)
+        if not self.request.cancelled and not image.isNull():
+            self.request.decoded.emit(image)
+
+
+class ImageDecoder:
+    """Decodes images into `QImage`s on a pool of worker threads.
+
+    Connect to `DecodeImage.decoded` from the GUI thread, where converting to a `QPixmap` is cheap.
+    """
+
+    def __init__(self, threads: int | None = None) -> None:
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads or max((os.cpu_count() or 2) // 2, 1))
+
+    @classmethod
+    @cache
+    def get(cls):
+        return cls()
+
+    def decode(self, key: PixmapKey, receiver: Callable[[QImage], None] | None = None) -> DecodeImage:
+        """Starts decoding `key`. Pass the slot for `decoded` here, a fast decode can finish before `decode` returns."""
+        request = DecodeImage(key)
+        if receiver is not None:
+            request.decoded.connect(receiver)
+        self.pool.start(_DecodeTask(request))
+        return request
+
+    def wait(self, ms: int = 5_000) -> bool:
+        return self.pool.waitForDone(ms)
@@ -1,73 +1,311 @@
 import contextlib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from http import HTTPStatus
 from pathlib import Path
 from queue import Empty, Queue
 
 import requests
-from PIL import Image
 from PySide6.QtCore import (
     QObject,
     QRunnable,
-    QThread,
+    QThreadPool,
     QUrl,
     Signal,
+    Slot,
 )
 
+from ytm_qt.caching.thumbnails import (
+    THUMBNAIL_SIZE,
+    ThumbnailCodec,
+    ThumbnailValidators,
+    conditional_headers,
+    existing_variant,
+    save_pyramid,
+    validators_from,
+)
+from ytm_qt.telemetry.stats import PoolStats, Telemetry
+
+from .bandwidth import BandwidthScheduler, TrafficClass
+from .http_client import HttpClient
+from .retry import CircuitBreakers, FailureHandler
+
 
 class DownloadIcon(QObject):
+    """Downloads a thumbnail into the pyramid at `output_path`.
+
+    Args:
+        url (QUrl): The source image, ideally the smallest one that covers `size`.
+        output_path (Path): The item's full thumbnail path, which the sized variants are stored next to.
+        size (int | None): The pyramid level wanted, or None for the full image.
+        validators (ThumbnailValidators | None): What the server said last time. When the variant is
+            already on disk, the request is conditional and a 304 only refreshes `validated`.
+    """
+
     finished = Signal()
+    error = Signal(Exception)
+    validated = Signal(dict)  # ThumbnailValidators
+    cancel_requested = Signal()
 
-    def __init__(self, url: QUrl, output_path: Path, small=True, parent=None):
+    def __init__(
+        self,
+        url: QUrl,
+        output_path: Path,
+        size: int | None = THUMBNAIL_SIZE,
+        validators: ThumbnailValidators | None = None,
+        parent=None,
+    ):
         super().__init__(parent)
         self.url = url
         self.output_path = output_path
-        self.small = small
+        self.size = size
+        self.validators = validators
+        # Set by the IconDownloader once nobody waits for this download anymore
+        self.dropped = False
+        self.attempts = 0
+        self.queued_at = time.perf_counter()
+
+    def cancel(self):
+        """Tells the downloader this icon isn't needed anymore. A download others still wait for goes ahead."""
+        self.cancel_requested.emit()
 
 
 class DownloadIconProvider(QRunnable):
-    def __init__(self, q: Queue[DownloadIcon]) -> None:
+    """Downloads icons from the queue, blocking while it is empty.
+
+    Returns once a None is taken from the queue, or once nothing has arrived for `idle_timeout`
+    seconds and no retries are waiting, so an idle pool doesn't hold on to its threads.
+    """
+
+    def __init__(
+        self,
+        q: Queue[DownloadIcon | None],
+        scheduler: BandwidthScheduler | None = None,
+        failures: FailureHandler[DownloadIcon] | None = None,
+        stats: PoolStats | None = None,
+        client: HttpClient | None = None,
+        idle_timeout: float = 5.0,
+        on_exit: Callable[[], None] | None = None,
+        codec: ThumbnailCodec | None = None,
+    ) -> None:
         super().__init__()
         self.queue = q
-        self.running = True
+        self.codec = codec
+        self.client = client or HttpClient(max_connections=1)
+        self.scheduler = scheduler
+        self.failures = failures if failures is not None else FailureHandler()
+        self.stats = stats
+        self.idle_timeout = idle_timeout
+        self.on_exit = on_exit
 
     def run(self):
-        while self.running:
-            try:
-                with contextlib.suppress(Empty):
-                    icon_info = self.queue.get_nowait()
-                    print(f"Downloading icon at {icon_info.url.toString()} to {icon_info.output_path}")
-                    data = requests.get(icon_info.url.toString())
-                    if not data.ok:
-                        continue
+        try:
+            while True:
+                for icon_info in self.failures.ready():
+                    icon_info.queued_at = time.perf_counter()
+                    self.queue.put(icon_info)
+                retry_in = self.failures.next_ready()
+                try:
+                    icon_info = self.queue.get(
+                        timeout=self.idle_timeout if retry_in is None else min(retry_in, self.idle_timeout)
+                    )
+                except Empty:
+                    if retry_in is None:
+                        return
+                    continue
+                try:
+                    if icon_info is None:
+                        return
+                    if not icon_info.dropped:
+                        self.download(icon_info)
+                finally:
+                    self.queue.task_done()
+        finally:
+            if self.on_exit is not None:
+                self.on_exit()
+
+    def download(self, icon_info: DownloadIcon):
+        host = icon_info.url.host()
+        try:
+            if not self.failures.admit(icon_info, host):
+                return
+        except Exception as e:
+            if self.stats is not None:
+                self.stats.add_failure()
+            icon_info.error.emit(e)
+            return
+
+        started = self.stats.started(icon_info.queued_at) if self.stats is not None else 0.0
+        ok = self._download(icon_info, host)
+        if self.stats is not None:
+            self.stats.finished(started, ok=ok is True, retrying=ok is None)
+
+    def _download(self, icon_info: DownloadIcon, host: str) -> bool | None:
+        """Returns True when finished, None when a retry was scheduled and False on failure."""
+        url = icon_info.url.toString()
+        headers = {}
+        if icon_info.validators is not None and existing_variant(icon_info.output_path, icon_info.size) is not None:
+            headers = conditional_headers(icon_info.validators)
+        try:
+            print(f"Downloading icon at {url} to {icon_info.output_path}")
+            with self.client.get(url, headers=headers) as data:
+                not_modified = bool(headers) and data.status_code == HTTPStatus.NOT_MODIFIED
+                if not not_modified:
                     data.raise_for_status()
-                    content = data.content
-                    if not icon_info.output_path.parent.exists():
-                        icon_info.output_path.parent.mkdir(parents=True)
-                    with open(icon_info.output_path, "wb") as f:
-                        f.write(content)
+                content = b"" if not_modified else self._read(data, host)
+                validators = validators_from(data.headers, url, icon_info.validators)
+        except Exception as e:
+            if self.failures.failure(icon_info, host, e):
+                return None
+            print(f"Failed to download icon at {icon_info.url.toString()}: {e}")
+            icon_info.error.emit(e)
+            return False
+        self.failures.success(host)
+        if self.stats is not None:
+            self.stats.add_bytes(len(content))
 
-                    # Crop image to a square
-                    im = Image.open(icon_info.output_path)
-                    width, height = im.size
-                    smaller = min(width, height)
+        if not not_modified:
+            try:
+                save_pyramid(content, icon_info.output_path, icon_info.size, self.codec)
+            except Exception as e:
+                print(e)
+                icon_info.error.emit(e)
+                return False
+        icon_info.validated.emit(validators)
+        icon_info.finished.emit()
+        return True
 
-                    left = (width - smaller) / 2
-                    top = (height - smaller) / 2
-                    right = (width + smaller) / 2
-                    bottom = (height + smaller) / 2
-                    im = im.crop((left, top, right, bottom))  # type: ignore
+    def _read(self, response: requests.Response, host: str) -> bytes:
+        if self.scheduler is None:
+            return response.content
+        chunks = []
+        for chunk in response.iter_content(16 * 1024):
+            self.scheduler.acquire(TrafficClass.THUMBNAILS, host, len(chunk))
+            chunks.append(chunk)
+        return b"".join(chunks)
 
-                    if icon_info.small and smaller > 128:
-                        im = im.resize((128, 128), Image.ADAPTIVE)
 
-                    im.save(icon_info.output_path, "PNG")
-                    icon_info.finished.emit()
+@dataclass
+class _Pending:
+    task: DownloadIcon
+    waiting: int = 1
 
-                    self.queue.task_done()
 
-            except Exception as e:
-                print(e)
+class IconDownloader(QObject):
+    """Runs the icon download workers, and merges requests for a thumbnail that is already on its way.
+
+    A request whose URL and output path match a pending one, at a size that one covers, is not queued.
+    It receives the pending download's `finished` and `error` instead. A download is only dropped
+    once every request waiting for it is cancelled.
+    """
+
+    def __init__(
+        self,
+        workers: int = 6,
+        scheduler: BandwidthScheduler | None = None,
+        breakers: CircuitBreakers | None = None,
+        telemetry: Telemetry | None = None,
+        codec: ThumbnailCodec | None = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.queue: Queue[DownloadIcon | None] = Queue()
+        self.scheduler = scheduler
+        self.codec = codec
+        self.failures: FailureHandler[DownloadIcon] = FailureHandler(breakers)
+        self.stats = (telemetry or Telemetry()).pool("icons", self.queue.qsize)
+        self.client = HttpClient(max_connections=workers)
+        self.pending: dict[tuple[str, Path], _Pending] = {}
+        self.merged = 0
+
+        # Workers are started as icons arrive and return once idle
+        self.max_workers = workers
+        self.workers = 0
+        self.closing = False
+        self.lock = threading.Lock()
+        self.threadpool = QThreadPool(self)
+        self.threadpool.setMaxThreadCount(workers)
+
+    def _spawn(self):
+        with self.lock:
+            if self.closing:
+                return
+            # Every queued or in-progress icon should have a worker, up to the limit
+            while self.workers < min(self.max_workers, self.queue.unfinished_tasks):
+                self.workers += 1
+                self.threadpool.start(
+                    DownloadIconProvider(
+                        self.queue,
+                        self.scheduler,
+                        self.failures,
+                        self.stats,
+                        self.client,
+                        on_exit=self._exited,
+                        codec=self.codec,
+                    )
+                )
+
+    def _exited(self):
+        with self.lock:
+            self.workers -= 1
+        # An icon may have arrived while this worker was giving up
+        self._spawn()
+
+    def shutdown(self, drain: bool = False, ms: int = 5_000) -> bool:
+        """Stops every worker and closes the connections. Returns False if they didn't stop within `ms`.
+
+        Args:
+            drain (bool): Download the icons that are already queued first, instead of dropping them.
+                Retries that are still waiting are always dropped.
+        """
+        with self.lock:
+            self.closing = True
+            if not drain:
+                with contextlib.suppress(Empty):
+                    while True:
+                        self.queue.get_nowait()
+                        self.queue.task_done()
+            for _ in range(self.workers):
+                self.queue.put(None)
+        stopped = self.threadpool.waitForDone(ms)
+        self.client.close()
+        return stopped
+
+    @Slot(DownloadIcon)
+    def request(self, task: DownloadIcon):
+        if self.closing:
+            return
+        key = (task.url.toString(), task.output_path)
+        if (pending := self.pending.get(key)) is not None and _covers(pending.task.size, task.size):
+            pending.task.finished.connect(task.finished)
+            pending.task.error.connect(task.error)
+            pending.task.validated.connect(task.validated)
+            pending.waiting += 1
+            task.cancel_requested.connect(lambda: self._cancel(key, pending))
+            self.merged += 1
+            return
+
+        pending = _Pending(task)
+        self.pending[key] = pending
+        task.finished.connect(lambda: self._done(key, pending))
+        task.error.connect(lambda _: self._done(key, pending))
+        task.cancel_requested.connect(lambda: self._cancel(key, pending))
+        self.queue.put(task)
+        self._spawn()
+
+    def _done(self, key: tuple[str, Path], pending: _Pending):
+        if self.pending.get(key) is pending:
+            del self.pending[key]
+
+    def _cancel(self, key: tuple[str, Path], pending: _Pending):
+        pending.waiting -= 1
+        if pending.waiting <= 0:
+            # Workers skip it when it comes up, or when its retry is due
+            pending.task.dropped = True
+            self._done(key, pending)
 
-            QThread.msleep(200)
 
-    def stop(self):
-        self.running = False
+def _covers(size: int | None, wanted: int | None) -> bool:
+    return size is None or (wanted is not None and size >= wanted)
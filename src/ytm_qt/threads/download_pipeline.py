@@ -0,0 +1,290 @@
+import heapq
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from itertools import count
+from queue import Empty, Full, PriorityQueue
+
+from PySide6.QtCore import QDeadlineTimer, QThread
+from yt_dlp import YoutubeDL
+
+from ytm_qt.telemetry.stats import PoolStats, Telemetry
+
+from .bandwidth import BandwidthScheduler
+from .retry import CircuitBreakers, CircuitOpenError, FailureHandler
+from .ytdlrunner import YTMDownload
+
+_sequence = count()
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int = field(default_factory=lambda: next(_sequence))
+    request: YTMDownload = field(default=None, compare=False)  # type: ignore
+    queued_at: float = field(default_factory=time.perf_counter, compare=False)
+
+    @classmethod
+    def of(cls, request: YTMDownload):
+        return cls(request.traffic_class.value, request=request)
+
+    @classmethod
+    def stop(cls):
+        """Tells the worker that takes it to exit. Sorts before every real job."""
+        return cls(-1)
+
+
+class _StageQueue(PriorityQueue[_Job]):
+    def close(self, workers: int):
+        """Puts a stop job in for each worker, even when the queue is full."""
+        with self.mutex:
+            for _ in range(workers):
+                self._put(_Job.stop())
+                self.unfinished_tasks += 1
+            self.not_empty.notify_all()
+
+    def reprioritize(self, request: YTMDownload) -> bool:
+        """Gives the request's waiting job the priority of its current class. Returns False if it isn't waiting here."""
+        with self.mutex:
+            for job in self.queue:
+                if job.request is request:
+                    job.priority = request.traffic_class.value
+                    heapq.heapify(self.queue)
+                    return True
+        return False
+
+
+class PipelineStage:
+    """A bounded queue drained by a fixed number of worker threads.
+
+    Jobs are picked up by the priority of their traffic class, then in submission order.
+    Stages with a `FailureHandler` retry transient errors, and hold jobs back while their host's breaker is open.
+    Finished jobs are pushed into the next stage's queue. Since that `put` blocks while the
+    next queue is full, a slow stage holds back the stages before it instead of piling up files.
+    Idle workers block on the queue, waking only for jobs, retries coming due, or `stop`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[YTMDownload], None],
+        workers: int,
+        maxsize: int = 0,
+        failures: FailureHandler[YTMDownload] | None = None,
+        telemetry: Telemetry | None = None,
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.failures = failures
+        self.queue = _StageQueue(maxsize)
+        self.next_stage: PipelineStage | None = None
+        self.stats = (telemetry or Telemetry()).pool(f"download/{name}", self.queue.qsize)
+        self.running = True
+        self.workers = [_StageWorker(self) for _ in range(workers)]
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self):
+        self.running = False
+        self.queue.close(len(self.workers))
+
+    def wait(self, deadline: QDeadlineTimer) -> bool:
+        """Waits for the workers until `deadline`. Returns False if any is still running."""
+        return all(worker.wait(deadline) for worker in self.workers)
+
+    def terminate(self):
+        for worker in self.workers:
+            if worker.isRunning():
+                worker.terminate()
+                worker.wait()
+
+    def put(self, job: _Job):
+        # Retry so a stopping pipeline can't deadlock a worker on a full queue
+        while self.running:
+            # The request may have been promoted while this waited for room
+            job.priority = job.request.traffic_class.value
+            try:
+                self.queue.put(job, timeout=0.25)
+                return
+            except Full:
+                continue
+
+    def requeue_ready(self):
+        if self.failures is None:
+            return
+        for request in self.failures.ready():
+            try:
+                self.queue.put_nowait(_Job.of(request))
+            except Full:
+                if not self.failures.defer(request, 1.0):
+                    self._fail(request, CircuitOpenError(f"No room to retry {request.url.toString()}"))
+
+    def _fail(self, request: YTMDownload, e: Exception):
+        print(f"[{self.name}] {request.url.toString()} failed: {e}")
+        request.error.emit(e)
+        request.finished.emit()
+
+    def process(self, job: _Job):
+        request = job.request
+        host = request.host()
+        if self.failures is not None:
+            try:
+                if not self.failures.admit(request, host):
+                    return
+            except CircuitOpenError as e:
+                self.stats.add_failure()
+                self._fail(request, e)
+                return
+
+        started = self.stats.started(job.queued_at)
+        try:
+            self.handler(request)
+        except Exception as e:
+            retrying = self.failures is not None and self.failures.failure(request, host, e)
+            self.stats.finished(started, ok=False, retrying=retrying)
+            if retrying:
+                print(f"[{self.name}] Retrying {request.url.toString()} (attempt {request.attempts + 1}): {e}")
+            else:
+                self._fail(request, e)
+            return
+
+        if self.failures is not None:
+            self.failures.success(host)
+        self.stats.finished(started)
+
+        if self.next_stage is not None:
+            # Every stage gets the whole retry budget
+            request.attempts = 0
+            self.next_stage.put(_Job.of(request))
+        else:
+            request.finished.emit()
+
+
+class _StageWorker(QThread):
+    def __init__(self, stage: PipelineStage) -> None:
+        super().__init__()
+        self.stage = stage
+
+    def run(self):
+        failures = self.stage.failures
+        while True:
+            self.stage.requeue_ready()
+            try:
+                job = self.stage.queue.get(timeout=failures.next_ready() if failures is not None else None)
+            except Empty:
+                continue
+            try:
+                if job.request is None:
+                    return
+                self.stage.process(job)
+            finally:
+                self.stage.queue.task_done()
+
+
+class DownloadPipeline:
+    """Runs `YTMDownload`s through separate extract, fetch, postprocess and commit stages.
+
+    A YoutubeDLProvider keeps its slot for the whole download, so a slow ffmpeg transcode
+    keeps the network idle. Here every stage has its own workers, and bounded queues between
+    them, so the network and the CPU can both be busy during bulk downloads.
+
+    Args:
+        opts (dict): The YoutubeDL options. Its postprocessors only run in the postprocess stage,
+            and `ignoreerrors` is always off so failures can be retried.
+        workers (dict[str, int] | None): Overrides for the amount of workers per stage.
+        maxsize (int): The size of the queues between stages.
+        scheduler (BandwidthScheduler | None): Throttles the fetch stage by the traffic class of each request.
+        breakers (CircuitBreakers | None): Shared with the other workers talking to the same hosts.
+        telemetry (Telemetry | None): Receives the stats of every stage.
+    """
+
+    def __init__(
+        self,
+        opts: dict,
+        workers: dict[str, int] | None = None,
+        maxsize: int = 4,
+        scheduler: BandwidthScheduler | None = None,
+        breakers: CircuitBreakers | None = None,
+        telemetry: Telemetry | None = None,
+    ) -> None:
+        self.opts = {**opts, "ignoreerrors": False}
+        self.scheduler = scheduler
+        breakers = breakers or CircuitBreakers()
+        telemetry = telemetry or Telemetry()
+        self.fetch_opts = {k: v for k, v in self.opts.items() if k != "postprocessors"}
+        workers = {
+            "extract": 2,
+            "fetch": 3,
+            "postprocess": max((os.cpu_count() or 2) // 2, 1),
+            "commit": 1,
+            **(workers or {}),
+        }
+
+        # The first queue is unbounded so submitting from the GUI thread never blocks
+        self.stages = [
+            PipelineStage("extract", self._extract, workers["extract"], 0, FailureHandler(breakers), telemetry),
+            PipelineStage("fetch", self._fetch, workers["fetch"], maxsize, FailureHandler(breakers), telemetry),
+            PipelineStage("postprocess", self._postprocess, workers["postprocess"], maxsize, telemetry=telemetry),
+            PipelineStage("commit", YTMDownload.commit, workers["commit"], maxsize, telemetry=telemetry),
+        ]
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.next_stage = next_stage
+
+    def _extract(self, request: YTMDownload):
+        if request.attempts == 0:
+            request.started.emit()
+        with YoutubeDL(self.fetch_opts) as ytdl:
+            request.extract(ytdl)
+
+    def _fetch(self, request: YTMDownload):
+        hooks = [request.progress.emit, self.stages[1].stats.progress_hook()]
+        if self.scheduler is not None:
+            hooks.append(self.scheduler.progress_hook(lambda: request.traffic_class))
+        with YoutubeDL({"progress_hooks": hooks, **self.fetch_opts}) as ytdl:
+            request.fetch(ytdl)
+
+    def _postprocess(self, request: YTMDownload):
+        with YoutubeDL(self.opts) as ytdl:
+            request.postprocess(ytdl)
+
+    def submit(self, request: YTMDownload):
+        request.promoted.connect(self.reprioritize)
+        self.stages[0].put(_Job.of(request))
+
+    def reprioritize(self, request: YTMDownload):
+        """Moves a promoted request ahead of the lower classes in whichever stage it is waiting in.
+
+        Requests that are already being worked on pick the new class up in the next stage.
+        """
+        for stage in self.stages:
+            if stage.queue.reprioritize(request):
+                return
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def wait(self, deadline: QDeadlineTimer | int = 10_000) -> bool:
+        """Waits for every stage to stop, all within one deadline. Returns False if any worker is still running.
+
+        Args:
+            deadline (QDeadlineTimer | int): Shared with the caller's other threads, or milliseconds from now.
+        """
+        if isinstance(deadline, int):
+            deadline = QDeadlineTimer(deadline)
+        return all(stage.wait(deadline) for stage in self.stages)
+
+    def terminate(self):
+        """Kills the workers still stuck in a job, like a fetch or an ffmpeg run, after `wait` ran out."""
+        for stage in self.stages:
+            stage.terminate()
+
+    def metrics(self) -> dict[str, dict]:
+        return {stage.name: stage.stats.snapshot() for stage in self.stages}
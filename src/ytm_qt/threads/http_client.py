@@ -0,0 +1,41 @@
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    """A keep-alive, connection-pooled HTTP session shared between worker threads.
+
+    Thumbnails come from a handful of CDN hosts, so reusing connections skips a TCP and
+    TLS handshake for almost every request.
+
+    Args:
+        max_connections (int): The amount of requests that can be in flight at once.
+        timeout (tuple[float, float]): The connect and read timeouts of every request, in seconds.
+    """
+
+    def __init__(self, max_connections: int = 6, timeout: tuple[float, float] = (5.0, 20.0)) -> None:
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @contextmanager
+    def get(self, url: str, **kwargs) -> Generator[requests.Response, None, None]:
+        """Streams a GET request. The body should be read inside the `with` block,
+        after which the connection goes back to the pool.
+        """
+        with self.slots:
+            response = self.session.get(url, stream=True, timeout=self.timeout, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,230 @@
+import heapq
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from itertools import count
+from typing import Protocol
+
+import requests
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, ExtractorError
+
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host is paused by its breaker and there is no room to wait for it."""
+
+
+def is_transient(e: BaseException | None) -> bool:
+    """Checks whether an error, or anything that caused it, is worth retrying.
+
+    Follows the causes yt-dlp and requests wrap their errors in, and accepts
+    connection problems, timeouts, throttling and server errors.
+    """
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        if isinstance(e, HTTPError):
+            return e.status in TRANSIENT_STATUSES
+        if isinstance(e, requests.HTTPError):
+            return e.response is not None and e.response.status_code in TRANSIENT_STATUSES
+        if isinstance(e, TransportError | requests.ConnectionError | requests.Timeout | TimeoutError):
+            return True
+
+        if isinstance(e, DownloadError) and e.exc_info is not None:
+            e = e.exc_info[1]
+        elif isinstance(e, ExtractorError) and e.cause is not None:
+            e = e.cause
+        else:
+            e = e.__cause__ or e.__context__
+    return False
+
+
+class Retryable(Protocol):
+    attempts: int
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Args:
+        attempts (int): The total amount of tries, including the first.
+        base (float): The delay in seconds of the first retry, before jitter.
+        cap (float): The largest possible delay in seconds.
+    """
+
+    attempts: int = 4
+    base: float = 1.0
+    cap: float = 60.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+class BreakerState(Enum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """Stops requests to a host after too many consecutive failures.
+
+    After `reset_timeout` seconds a single trial request is let through.
+    If it succeeds the breaker closes again, otherwise it stays open for another timeout.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def remaining(self, now: float) -> float:
+        """The seconds until a request may be made, or 0 if it can be made now. Claims the half-open trial."""
+        if self.state == BreakerState.CLOSED:
+            return 0.0
+        wait = self.opened_at + self.reset_timeout - now
+        if self.state == BreakerState.OPEN and wait <= 0:
+            self.state = BreakerState.HALF_OPEN
+            return 0.0
+        return max(wait, 1.0)
+
+    def success(self):
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+
+    def failure(self, now: float):
+        self.failures += 1
+        if self.state == BreakerState.HALF_OPEN or self.failures >= self.threshold:
+            self.state = BreakerState.OPEN
+            self.opened_at = now
+
+
+class CircuitBreakers:
+    """Circuit breakers by host, shared between the workers that talk to the same hosts."""
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def remaining(self, host: str) -> float:
+        with self.lock:
+            return self._get(host).remaining(time.monotonic())
+
+    def success(self, host: str):
+        with self.lock:
+            self._get(host).success()
+
+    def failure(self, host: str):
+        with self.lock:
+            self._get(host).failure(time.monotonic())
+
+    def open_hosts(self) -> list[str]:
+        with self.lock:
+            return [host for host, b in self.breakers.items() if b.state != BreakerState.CLOSED]
+
+    def _get(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.threshold, self.reset_timeout)
+        return self.breakers[host]
+
+
+@dataclass(order=True)
+class _Delayed[T]:
+    ready_at: float
+    sequence: int
+    item: T = field(compare=False)
+
+
+class FailureHandler[T: Retryable]:
+    """Decides what happens to a failed or blocked item of a worker pool.
+
+    Items whose host has an open breaker, and items that failed with a transient error,
+    wait in a bounded queue. Workers take them back out with `ready` once their delay has
+    passed. When the queue is full, or the item ran out of attempts, the failure is final.
+    """
+
+    def __init__(
+        self,
+        breakers: CircuitBreakers | None = None,
+        policy: RetryPolicy | None = None,
+        maxsize: int = 256,
+    ) -> None:
+        self.breakers = breakers or CircuitBreakers()
+        self.policy = policy or RetryPolicy()
+        self.maxsize = maxsize
+        self._delayed: list[_Delayed[T]] = []
+        self._sequence = count()
+        self.lock = threading.Lock()
+        self.retried = 0
+        self.deferred = 0
+
+    def defer(self, item: T, delay: float) -> bool:
+        """Holds on to the item for `delay` seconds. Returns False if the queue is full."""
+        with self.lock:
+            if len(self._delayed) >= self.maxsize:
+                return False
+            heapq.heappush(self._delayed, _Delayed(time.monotonic() + delay, next(self._sequence), item))
+            return True
+
+    def admit(self, item: T, host: str) -> bool:
+        """Returns False and holds on to the item if its host is paused by a breaker.
+
+        Raises:
+            CircuitOpenError: The host is paused and the queue is full.
+        """
+        wait = self.breakers.remaining(host)
+        if wait <= 0:
+            return True
+        if not self.defer(item, wait):
+            raise CircuitOpenError(f"{host} is paused for {wait:.0f}s")
+        self.deferred += 1
+        return False
+
+    def success(self, host: str):
+        self.breakers.success(host)
+
+    def failure(self, item: T, host: str, e: BaseException) -> bool:
+        """Records a failure. Returns True if the item was queued for a retry."""
+        if isinstance(e, CircuitOpenError):
+            return False
+        if not is_transient(e):
+            # The host did answer, so it shouldn't keep its breaker open
+            self.breakers.success(host)
+            return False
+        self.breakers.failure(host)
+        item.attempts += 1
+        if item.attempts >= self.policy.attempts:
+            return False
+        if self.defer(item, self.policy.delay(item.attempts)):
+            self.retried += 1
+            return True
+        return False
+
+    def ready(self) -> list[T]:
+        """Removes and returns every item whose delay has passed."""
+        now = time.monotonic()
+        items = []
+        with self.lock:
+            while self._delayed and self._delayed[0].ready_at <= now:
+                items.append(heapq.heappop(self._delayed).item)
+        return items
+
+    def next_ready(self) -> float | None:
+        """The seconds until the next item is ready, or None if nothing is waiting."""
+        with self.lock:
+            if not self._delayed:
+                return None
+            return max(self._delayed[0].ready_at - time.monotonic(), 0.0)
+
+    def pending(self) -> int:
+        with self.lock:
+            return len(self._delayed)
@@ -1,8 +1,10 @@
+import time
 import uuid
 from abc import abstractmethod
-from collections import deque
 from collections.abc import Callable
+from pathlib import Path
 from pprint import pprint
+from queue import Empty, Queue
 
 from PySide6.QtCore import (
     QObject,
@@ -16,6 +18,10 @@ from ytm_qt.dicts import (
     YTMDownloadResponse,
     YTMResponse,
 )
+from ytm_qt.telemetry.stats import PoolStats
+
+from .bandwidth import TrafficClass
+from .retry import FailureHandler
 
 
 class YTDLUser(QObject):
@@ -26,10 +32,15 @@ class YTDLUser(QObject):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.attempts = 0
+        self.queued_at = time.perf_counter()
 
     def key(self):
         return str(uuid.uuid1())
 
+    def host(self) -> str:
+        return ""
+
     def run(self, ytdl: YoutubeDL):
         self.started.emit()
         self.process(ytdl)
@@ -50,63 +61,166 @@ class YTMExtractInfo(YTDLUser):
     def key(self):
         return self.url
 
+    def host(self) -> str:
+        return QUrl(self.url).host()
+
     def process(self, ytdl: YoutubeDL) -> None:
-        try:
-            info = ytdl.extract_info(self.url, download=False, process=self.do_process)
-        except DownloadError as e:
-            self.error.emit(e)
+        info = ytdl.extract_info(self.url, download=False, process=self.do_process)
         if info is None:
-            self.error.emit(Exception("Info is None"))
-        else:
-            self.processed.emit(info)
+            raise DownloadError("Info is None")
+        self.processed.emit(info)
 
 
 class YTMDownload(YTDLUser):
-    processed = Signal(YTMDownloadResponse)
+    """Downloads a single song and moves the finished file into the cache.
+
+    The work is split into the same stages the `DownloadPipeline` runs on separate workers,
+    so a download can either be run in one go through `process` or handed stage by stage
+    to the pipeline.
+    """
 
-    def __init__(self, url: QUrl, parent=None) -> None:
+    processed = Signal(YTMDownloadResponse)
+    promoted = Signal(QObject)  # self
+
+    def __init__(
+        self,
+        url: QUrl,
+        output_path: Path | None = None,
+        traffic_class: TrafficClass = TrafficClass.PREFETCH,
+        parent=None,
+    ) -> None:
         super().__init__(parent)
         self.url = url
+        self.output_path = output_path
+        self.traffic_class = traffic_class
+        self.info: dict | None = None
+        self.download: dict | None = None
 
     def key(self):
         return self.url
 
-    def process(self, ytdl: YoutubeDL) -> None:
-        info = ytdl.extract_info(self.url.toString(), download=True)
+    def host(self) -> str:
+        return self.url.host()
+
+    def promote(self, traffic_class: TrafficClass):
+        """Raises the traffic class, ex. when a prefetched song starts playing. Never lowers it."""
+        if traffic_class.value < self.traffic_class.value:
+            self.traffic_class = traffic_class
+            self.promoted.emit(self)
+
+    def extract(self, ytdl: YoutubeDL) -> None:
+        """Resolves the metadata of the url without selecting or downloading any formats."""
+        self.info = ytdl.extract_info(self.url.toString(), download=False, process=False)
+        if self.info is None:
+            raise DownloadError("Failed to extract info")
+
+    def fetch(self, ytdl: YoutubeDL) -> None:
+        """Selects a format and downloads the raw bytes. `ytdl` should not have postprocessors."""
+        assert self.info is not None
+        self.info = ytdl.process_ie_result(self.info, download=True)
+        if self.info is None or not self.info.get("requested_downloads"):
+            raise DownloadError("Nothing was downloaded")
+        self.download = self.info["requested_downloads"][0]
+
+    def postprocess(self, ytdl: YoutubeDL) -> None:
+        """Runs the postprocessors of `ytdl` (ex. ffmpeg) on the fetched file."""
+        assert self.info is not None and self.download is not None
+        self.download = ytdl.post_process(self.download["filepath"], self.download)
+        self.info["requested_downloads"][0] = self.download
+
+    def commit(self) -> None:
+        """Moves the finished file to `output_path` and announces the result."""
+        assert self.info is not None and self.download is not None
+        if self.output_path is not None:
+            if not self.output_path.parent.exists():
+                self.output_path.parent.mkdir(parents=True)
+            Path(self.download["filepath"]).replace(self.output_path)
+            print(f"Moved {self.download['filepath']} to {self.output_path}")
+            self.download["filepath"] = str(self.output_path)
+        self.processed.emit(self.info)
 
-        if info is None:
-            self.error.emit("Failed to extract info")
-        else:
-            self.processed.emit(info)
+    def process(self, ytdl: YoutubeDL) -> None:
+        self.extract(ytdl)
+        self.fetch(ytdl)
+        self.commit()
 
 
 class YoutubeDLProvider(QThread):
+    """Runs `YTDLUser`s from a queue shared with the other providers, blocking while it is empty.
+
+    Only wakes early for retries coming due, and returns once it takes a None, which `stop` puts in.
+    """
+
     err = Signal(Exception)
 
-    def __init__(self, opts: dict, q: deque[YTDLUser]) -> None:
+    def __init__(
+        self,
+        opts: dict,
+        q: Queue[YTDLUser | None],
+        failures: FailureHandler[YTDLUser] | None = None,
+        stats: PoolStats | None = None,
+    ) -> None:
         super().__init__()
-        self.opts = opts
+        # With errors ignored yt-dlp returns None instead, and nothing could be retried
+        self.opts = {**opts, "ignoreerrors": False}
         self.queue = q
-        self.running = True
+        self.failures = failures or FailureHandler()
+        self.stats = stats
 
     def run(self):
-        while self.running:
+        while True:
+            for user in self.failures.ready():
+                user.queued_at = time.perf_counter()
+                self.queue.put(user)
+            try:
+                user = self.queue.get(timeout=self.failures.next_ready())
+            except Empty:
+                continue
             try:
-                user = self.queue.popleft()
-                try:
-                    with YoutubeDL(
-                        {
-                            "progress_hooks": [user.progress.emit],
-                            **self.opts,
-                        }
-                    ) as ytdl:
-                        user.run(ytdl)
-                except Exception as e:
-                    self.err.emit(e)
-            except IndexError:
-                pass
-
-            QThread.msleep(250)  # sleep for 250 ms to avoid busy waiting
+                if user is None:
+                    return
+                self._run_user(user)
+            finally:
+                self.queue.task_done()
+
+    def _run_user(self, user: YTDLUser):
+        try:
+            if not self.failures.admit(user, user.host()):
+                return
+        except Exception as e:
+            self._failed(user, e)
+            return
+
+        started = self.stats.started(user.queued_at) if self.stats is not None else 0.0
+        hooks = [user.progress.emit]
+        if self.stats is not None:
+            hooks.append(self.stats.progress_hook())
+        try:
+            with YoutubeDL(
+                {
+                    "progress_hooks": hooks,
+                    **self.opts,
+                }
+            ) as ytdl:
+                user.run(ytdl)
+        except Exception as e:
+            retrying = self.failures.failure(user, user.host(), e)
+            if self.stats is not None:
+                self.stats.finished(started, ok=False, retrying=retrying)
+            if retrying:
+                print(f"Retrying {user.key()} (attempt {user.attempts + 1})")
+            else:
+                self._failed(user, e)
+        else:
+            self.failures.success(user.host())
+            if self.stats is not None:
+                self.stats.finished(started)
+
+    def _failed(self, user: YTDLUser, e: Exception):
+        user.error.emit(e)
+        user.finished.emit()
+        self.err.emit(e)
 
     def stop(self):
-        self.running = False
+        """Wakes one provider of the shared queue to exit, so every provider sharing it has to be stopped."""
+        self.queue.put(None)